@@ -1,5 +1,5 @@
 import React from 'react';
-import { getEnergyConsumption, EnergyConsumptionParams, EnergyConsumptionResponse } from '@/services/devices.service';
+import { getEnergyConsumption, EnergyConsumptionParams, EnergyConsumptionResponse, subscribeHomeEvents } from '@/services/devices.service';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip as RechartsTooltip, Legend, ResponsiveContainer } from 'recharts';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
@@ -44,6 +44,9 @@ const refreshIntervals = {
   month: 2592000000,
 };
 
+// events arriving close together trigger a single reload
+const EVENT_RELOAD_DELAY_MS = 2000;
+
 const EnergyConsumptionChart: React.FC<EnergyConsumptionChartProps> = ({ homeId, roomId, deviceId }) => {
   const [granularity, setGranularity] = React.useState<'minute' | 'hour' | 'day' | 'month'>('minute');
   const [data, setData] = React.useState<any[]>([]);
@@ -373,13 +376,35 @@ const EnergyConsumptionChart: React.FC<EnergyConsumptionChartProps> = ({ homeId,
   
   React.useEffect(() => { loadData(); }, [loadData]);
   
+  // reload on the consumption and state events of the home stream; the granularity interval is only
+  // a fallback for running devices, whose consumption grows without any event
   React.useEffect(() => {
-    if (refreshTimerRef.current) clearInterval(refreshTimerRef.current);
-    if (autoRefresh) {
-      refreshTimerRef.current = setInterval(() => { loadData(); }, refreshIntervals[granularity]);
-    }
-    return () => { if (refreshTimerRef.current) clearInterval(refreshTimerRef.current); };
-  }, [autoRefresh, granularity, loadData]);
+    if (!autoRefresh) return;
+    let reloadTimer: NodeJS.Timeout | null = null;
+    const scheduleFallback = () => {
+      if (refreshTimerRef.current) clearTimeout(refreshTimerRef.current);
+      refreshTimerRef.current = setTimeout(() => { loadData(); scheduleFallback(); }, refreshIntervals[granularity]);
+    };
+    const unsubscribe = homeId
+      ? subscribeHomeEvents(homeId, ({ event, data }) => {
+          if (event !== 'consumption' && event !== 'device_state') return;
+          if (deviceId && data?.device_id !== deviceId) return;
+          if (roomId && event === 'device_state' && data?.room_id !== roomId) return;
+          if (reloadTimer) return;
+          reloadTimer = setTimeout(() => {
+            reloadTimer = null;
+            loadData();
+            scheduleFallback();
+          }, EVENT_RELOAD_DELAY_MS);
+        })
+      : null;
+    scheduleFallback();
+    return () => {
+      if (unsubscribe) unsubscribe();
+      if (reloadTimer) clearTimeout(reloadTimer);
+      if (refreshTimerRef.current) clearTimeout(refreshTimerRef.current);
+    };
+  }, [autoRefresh, granularity, loadData, homeId, roomId, deviceId]);
 
   const getDeviceColor = (index: number) => {
     const colors = ['#3b82f6', '#10b981', '#ef4444', '#f59e0b', '#8b5cf6', '#ec4899', '#06b6d4'];
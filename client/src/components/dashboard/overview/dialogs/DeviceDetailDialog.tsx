@@ -11,7 +11,7 @@ import { cn } from '@/lib/utils';
 import DeviceDynamicControls from '../devices/DeviceDynamicControls';
 import DeviceIcon from '../devices/DeviceIcon';
 import { Edit, Trash2, AlertTriangle, Clock, Zap, History } from 'lucide-react';
-import { updateDevice, deleteDevice, Device, getDeviceCommand, getDeviceTotalConsumption } from '@/services/devices.service';
+import { updateDevice, deleteDevice, Device, getDeviceCommand, getDeviceTotalConsumption, subscribeHomeEvents } from '@/services/devices.service';
 import { apiFetch } from '@/services/api';
 import { formatDistanceToNow, parseISO } from 'date-fns';
 
@@ -46,6 +46,9 @@ interface DeviceStatsResponse {
   isOn: boolean;
 }
 
+// fallback refresh of the total, the stream only reports state changes and recorded readings
+const CONSUMPTION_FALLBACK_REFRESH_MS = 30000;
+
 const deviceColors: Record<string, string> = {
   light: 'bg-amber-500/10 text-amber-500 border-amber-500/20',
   thermostat: 'bg-red-500/10 text-red-500 border-red-500/20',
@@ -188,7 +191,8 @@ const DeviceDetailDialog: React.FC<DeviceDetailDialogProps> = ({ open, onOpenCha
     }
   }, [device, open]);
 
-  // fetch the total consumption and update it every second
+  // fetch the total consumption, then refresh it when the home stream reports a change for this device;
+  // a running device consumes without emitting events, so a slow poll keeps the total moving
   useEffect(() => {
     const fetchTotalConsumption = async () => {
       if (deviceDetails) {
@@ -204,22 +208,28 @@ const DeviceDetailDialog: React.FC<DeviceDetailDialogProps> = ({ open, onOpenCha
       }
     };
     
-    let intervalId: NodeJS.Timeout | null = null;
+    let unsubscribe: (() => void) | null = null;
+    let fallbackTimer: NodeJS.Timeout | null = null;
     
     if (open && deviceDetails) {
       // initial fetch
       fetchTotalConsumption();
       
-      // update frequently
-      intervalId = setInterval(() => {
-        fetchTotalConsumption();
-      }, 1000);
+      unsubscribe = subscribeHomeEvents(deviceDetails.home, ({ event, data }) => {
+        if (data?.device_id === deviceDetails.id && (event === 'consumption' || event === 'device_state')) {
+          fetchTotalConsumption();
+        }
+      });
+      fallbackTimer = setInterval(fetchTotalConsumption, CONSUMPTION_FALLBACK_REFRESH_MS);
     }
     
-    // clean up interval on close or unmount
+    // close the stream on close or unmount
     return () => {
-      if (intervalId) {
-        clearInterval(intervalId);
+      if (unsubscribe) {
+        unsubscribe();
+      }
+      if (fallbackTimer) {
+        clearInterval(fallbackTimer);
       }
     };
   }, [open, deviceDetails]);
@@ -12,13 +12,18 @@ import UserEditForm from '@/components/1_user/forms/UserEditForm';
 
 
 // Fonction utilitaire pour déterminer le niveau selon les points
-function getUserLevel(points?: number) {
+// the level comes from the API (points thresholds in server/users/points.py)
+const LEVEL_LABELS: Record<string, string> = {
+  BEGINNER: 'beginner',
+  INTERMEDIATE: 'intermediate',
+  ADVANCED: 'expert',
+};
+
+function getUserLevel(level?: string) {
   const { profile: user, loading } = useUser();
   if(user?.role === "ADMIN") return 'Administrator';
-  if (typeof points !== 'number') return '-';
-  if (points < 35) return 'beginner';
-  if (points < 70) return 'intermediate';
-  return 'expert';
+  if (!level) return '-';
+  return LEVEL_LABELS[level] ?? level.toLowerCase();
 }
 
 const ProfilePage: React.FC = () => {
@@ -128,7 +133,7 @@ const ProfilePage: React.FC = () => {
                 <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
                   <div>
                     <h3 className="text-sm font-medium text-muted-foreground">Level</h3>
-                    <p className="mt-1 capitalize">{getUserLevel(user?.points)}</p>
+                    <p className="mt-1 capitalize">{getUserLevel(user?.level)}</p>
                   </div>
                   <div>
                     <h3 className="text-sm font-medium text-muted-foreground">Points</h3>
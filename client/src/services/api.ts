@@ -1,6 +1,6 @@
 import { getTokenService } from './auth.service';
 
-const API_BASE_URL = "http://localhost:8000";
+export const API_BASE_URL = "http://localhost:8000";
 
 export function extractSuccessMessage(data: any): string {
   if (!data) return 'Operation successful';
@@ -1,4 +1,5 @@
-import { apiFetch, extractErrorMessage, extractSuccessMessage } from '@/services/api';import { toast } from 'sonner';
+import { apiFetch, extractErrorMessage, extractSuccessMessage, API_BASE_URL } from '@/services/api';import { toast } from 'sonner';
+import { getTokenService } from '@/services/auth.service';
 
 export interface PaginatedResponse<T> {
   status: string;
@@ -331,4 +332,31 @@ export async function getDeviceCommand(homeId: string, roomId: string, deviceId:
     toast.error(extractErrorMessage(error.raw, false, true));
     throw error;
   }
-}
\ No newline at end of file
+}
+
+export type HomeEventName = 'device_state' | 'command' | 'power' | 'consumption' | 'member_added' | 'member_removed';
+
+export interface HomeEvent {
+  event: HomeEventName;
+  data: any;
+}
+
+const HOME_EVENT_NAMES: HomeEventName[] = ['device_state', 'command', 'power', 'consumption', 'member_added', 'member_removed'];
+
+// Opens the server-sent events stream of a home, returns the unsubscribe function
+export function subscribeHomeEvents(homeId: string, onEvent: (event: HomeEvent) => void): () => void {
+  const token = getTokenService();
+  const source = new EventSource(
+    `${API_BASE_URL}/homes/${homeId}/events/?token=${encodeURIComponent(token || '')}`
+  );
+  HOME_EVENT_NAMES.forEach((name) => {
+    source.addEventListener(name, (e) => {
+      try {
+        onEvent({ event: name, data: JSON.parse((e as MessageEvent).data) });
+      } catch (error) {
+        console.error('Invalid home event:', error);
+      }
+    });
+  });
+  return () => source.close();
+}
@@ -0,0 +1 @@
+from utils import sqlite  # registers the connection_created hook of the SQLite profile
@@ -1,6 +1,7 @@
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
+from utils.sqlite import is_locked_error
 from utils.exceptions import (
     ResourceNotFoundError,
     ValidationError,
@@ -12,7 +13,12 @@ from utils.exceptions import (
 
 
 def custom_exception_handler(exc, context):
+    if is_locked_error(exc):
+        # every retry gave up: the client can try again in a moment
+        exc = ServiceUnavailableError("The database is busy, please retry.")
     response = exception_handler(exc, context)
+    if isinstance(exc, ServiceUnavailableError) and response is not None:
+        response['Retry-After'] = '1'
     
     if response is None:
         if isinstance(exc, Exception):
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.db.backends.signals import connection_created
+from utils.sqlite import configure_sqlite, is_locked_error
+
+
+def _use_database(path, profile):
+    """Point the default connection at `path`, with or without the SQLite profile."""
+    connections.close_all()
+    settings_dict = connections['default'].settings_dict
+    settings_dict['NAME'] = path
+    options = settings_dict.setdefault('OPTIONS', {})
+    if profile:
+        options['transaction_mode'] = 'IMMEDIATE'
+        connection_created.connect(configure_sqlite)
+    else:
+        options.pop('transaction_mode', None)
+        connection_created.disconnect(configure_sqlite)
+        settings.SQLITE_LOCK_RETRIES = 1
+    del connections['default']
+
+
+def _writer(path, profile, device_ids, user_id, transactions, results):
+    from django.contrib.auth import get_user_model
+    from devices.commands import execute_commands
+    from devices.models import Device
+    from users.points import award_points
+    _use_database(path, profile)
+    user = get_user_model().objects.get(pk=user_id)
+    done = locked = 0
+    started = time.perf_counter()
+    for i in range(transactions):
+        try:
+            device = Device.objects.select_related('room').get(pk=random.choice(device_ids))
+            # one command (state + command row + home version) and one points award, as POST .../commands/
+            execute_commands([(device, 'on_off', i % 2 == 0)], user=user)
+            award_points(user, 1, 'benchmark')
+            # read-modify-write in one transaction, as the serializers' save()
+            with transaction.atomic():
+                device = Device.objects.get(pk=device.pk)
+                device.name = f"Device {device.pk.hex[:8]} {i}"
+                device.save(update_fields=['name'])
+            done += 1
+        except OperationalError as error:
+            if not is_locked_error(error):
+                raise
+            locked += 1
+    results.put(('write', done, locked, time.perf_counter() - started))
+    connections.close_all()
+
+
+def _reader(path, profile, home_id, stop_at, results):
+    from homes.snapshot import load_home_tree
+    _use_database(path, profile)
+    done = locked = 0
+    started = time.perf_counter()
+    while time.perf_counter() < stop_at:
+        try:
+            load_home_tree(home_id)
+            done += 1
+        except OperationalError as error:
+            if not is_locked_error(error):
+                raise
+            locked += 1
+    results.put(('read', done, locked, time.perf_counter() - started))
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent write throughput on a scratch SQLite database, "
+        "with the default connection settings and with the SQLite profile (utils.sqlite)."
+    )
+    requires_system_checks = []
+    requires_migrations_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help="Writer processes")
+        parser.add_argument('--readers', type=int, default=2, help="Reader processes (home tree loads)")
+        parser.add_argument('--transactions', type=int, default=100, help="Iterations per writer")
+        parser.add_argument('--devices', type=int, default=50)
+        parser.add_argument('--mode', choices=['both', 'default', 'profile'], default='both')
+
+    def handle(self, *args, **options):
+        modes = ['default', 'profile'] if options['mode'] == 'both' else [options['mode']]
+        with tempfile.TemporaryDirectory() as directory:
+            for mode in modes:
+                path = os.path.join(directory, f'{mode}.sqlite3')
+                self._run(path, mode == 'profile', options)
+
+    def _seed(self, path, profile, options):
+        from django.contrib.auth import get_user_model
+        from devices.models import Device
+        from homes.models import Home
+        from rooms.models import Room
+        _use_database(path, profile)
+        call_command('migrate', verbosity=0)
+        user = get_user_model().objects.create_user(email='bench@synkro.local', username='bench')
+        home = Home.objects.create(name='Benchmark', owner=user)
+        room = Room.objects.create(home=home, name='Room')
+        devices = Device.objects.bulk_create([
+            Device(room=room, name=f'Device {i}', type='smart_bulb_x', product_code='BENCH', state={'on_off': False})
+            for i in range(options['devices'])
+        ])
+        connections.close_all()
+        return user.pk, home.id, [device.id for device in devices]
+
+    def _run(self, path, profile, options):
+        user_id, home_id, device_ids = self._seed(path, profile, options)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        started = time.perf_counter()
+        writers = [
+            context.Process(target=_writer, args=(path, profile, device_ids, user_id, options['transactions'], results))
+            for _ in range(options['writers'])
+        ]
+        for process in writers:
+            process.start()
+        # the readers run while the writers are expected to
+        stop_at = time.perf_counter() + 2.0
+        readers = [
+            context.Process(target=_reader, args=(path, profile, home_id, stop_at, results))
+            for _ in range(options['readers'])
+        ]
+        for process in readers:
+            process.start()
+        for process in writers + readers:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        totals = {'write': [0, 0], 'read': [0, 0]}
+        reader_seconds = 0.0
+        while not results.empty():
+            kind, done, locked, seconds = results.get()
+            totals[kind][0] += done
+            totals[kind][1] += locked
+            if kind == 'read':
+                reader_seconds = max(reader_seconds, seconds)
+        writes, write_errors = totals['write']
+        reads, read_errors = totals['read']
+        label = 'profile' if profile else 'default'
+        self.stdout.write(
+            f"{label:<8} {options['writers']} writers: {writes} iterations ok, {write_errors} locked, "
+            f"{writes / elapsed:.0f} it/s ({writes * 3 / elapsed:.0f} write tx/s) in {elapsed:.1f}s | "
+            f"{options['readers']} readers: {reads / max(reader_seconds, 1e-9):.0f} tree loads/s, {read_errors} locked"
+        )
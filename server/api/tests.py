@@ -0,0 +1,140 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from auth.tokens import HomeAccessRefreshToken
+from devices.device_catalogue import DEVICE_TYPES
+from devices.models import AutomationRule, Device, DeviceCommand, Scene
+from homes.models import Home, HomeInvitation
+from rooms.models import Room
+from utils.querycount import QueryRecorder
+
+User = get_user_model()
+
+# maximum number of SQL queries per request, independent of the size of the home;
+# the user row and the home access check are among them, unless a shared cache
+# is configured (with HOME_ACCESS_CLAIMS on for the access check)
+QUERY_BUDGETS = [
+    ('home list', 'get', '/homes/', None, 4),
+    ('home detail', 'get', '/homes/{home}/', None, 4),
+    ('home snapshot', 'get', '/homes/{home}/snapshot/', None, 7),
+    ('room list', 'get', '/homes/{home}/rooms/', None, 5),
+    ('room detail', 'get', '/homes/{home}/rooms/{room}/', None, 5),
+    ('home devices', 'get', '/homes/{home}/devices/', None, 5),
+    ('room devices', 'get', '/homes/{home}/rooms/{room}/devices/', None, 5),
+    ('device detail', 'get', '/homes/{home}/rooms/{room}/devices/{device}/', None, 4),
+    ('device update', 'patch', '/homes/{home}/rooms/{room}/devices/{device}/', {'name': 'Renamed'}, 10),
+    ('command list', 'get', '/homes/{home}/rooms/{room}/devices/{device}/commands/', None, 4),
+    ('command create', 'post', '/homes/{home}/rooms/{room}/devices/{device}/commands/',
+     {'capability': 'on_off', 'parameters': {'on_off': True}}, 10),
+    ('power summary', 'get', '/homes/{home}/power/', None, 3),
+    ('invitation list', 'get', '/homes/{home}/invitations/', None, 6),
+    ('automation list', 'get', '/homes/{home}/automations/', None, 4),
+    ('scene list', 'get', '/homes/{home}/scenes/', None, 4),
+    ('scene activate', 'post', '/homes/{home}/scenes/{scene}/activate/', None, 12),
+    ('me', 'get', '/me/', None, 2),
+]
+
+# read endpoints whose query count must not move when the home grows
+SIZE_INDEPENDENT = ['home list', 'home detail', 'home snapshot', 'room list', 'home devices', 'room devices', 'command list']
+
+
+def seed_home(owner, rooms=5, devices_per_room=10, commands_per_device=5, members=4):
+    now = timezone.now()
+    home = Home.objects.create(name='Budget home', owner=owner)
+    home.members.add(*[
+        User.objects.create_user(email=f'budget-member-{i}@synkro.local', username=f'budget-member-{i}')
+        for i in range(members)
+    ])
+    room_objects = Room.objects.bulk_create([Room(home=home, name=f'Room {i}') for i in range(rooms)])
+    devices = Device.objects.bulk_create([
+        Device(room=room, name=f'Device {i}', type=DEVICE_TYPES[i % len(DEVICE_TYPES)]['type'],
+               product_code='BUDGET', state={'on_off': False})
+        for room in room_objects for i in range(devices_per_room)
+    ])
+    DeviceCommand.objects.bulk_create([
+        DeviceCommand(device=device, capability='on_off', parameters={'on_off': i % 2 == 0},
+                      status=DeviceCommand.Status.SUCCESS, user=owner,
+                      executed_at=now - timedelta(minutes=i))
+        for device in devices for i in range(commands_per_device)
+    ])
+    HomeInvitation.objects.bulk_create([
+        HomeInvitation(home=home, inviter=owner, email=f'budget-invite-{i}@synkro.local',
+                       expires_at=now + timedelta(days=7))
+        for i in range(3)
+    ])
+    bulb = next(device for device in devices if 'on_off' in device.capabilities)
+    AutomationRule.objects.create(
+        home=home, name='Budget rule', trigger_device=bulb, trigger_capability='on_off',
+        trigger_value=True, actions=[]
+    )
+    scene = Scene.objects.create(
+        home=home, name='Budget scene', created_by=owner,
+        states={str(device.id): {'on_off': True} for device in devices if 'on_off' in device.capabilities}
+    )
+    return {'home': home.id, 'room': room_objects[0].id, 'device': bulb.id, 'scene': scene.id}
+
+
+class QueryBudgetTests(TestCase):
+    """Every endpoint stays within its SQL query budget, whatever the size of the home."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email='budget-owner@synkro.local', username='budget-owner', first_name='Budget')
+        cls.ids = seed_home(cls.owner)
+
+    def setUp(self):
+        # the home access and snapshot caches outlive the rolled back test transactions
+        cache.clear()
+        self.client = APIClient()
+        token = HomeAccessRefreshToken.for_user(self.owner).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def request(self, method, url, data=None):
+        return getattr(self.client, method)(url.format(**self.ids), data, format='json')
+
+    def test_endpoints_within_budget(self):
+        for name, method, url, data, budget in QUERY_BUDGETS:
+            with self.subTest(endpoint=name):
+                with QueryRecorder() as queries:
+                    response = self.request(method, url, data)
+                self.assertLess(response.status_code, 400)
+                # a budget is a maximum: assertNumQueries would pin the exact count
+                self.assertLessEqual(
+                    queries.count, budget,
+                    f"{name}: {queries.count}/{budget} queries, repeated: {queries.similar}"
+                )
+
+    def test_query_count_independent_of_home_size(self):
+        budgets = {name: (method, url) for name, method, url, _, _ in QUERY_BUDGETS}
+        counts = {}
+        for name in SIZE_INDEPENDENT:
+            with QueryRecorder() as queries:
+                self.request(*budgets[name])
+            counts[name] = queries.count
+
+        home = Home.objects.get(id=self.ids['home'])
+        room = Room.objects.get(id=self.ids['room'])
+        extra_rooms = Room.objects.bulk_create([Room(home=home, name=f'Extra room {i}') for i in range(5)])
+        Device.objects.bulk_create([
+            Device(room=target, name=f'Extra device {i}', type=DEVICE_TYPES[i % len(DEVICE_TYPES)]['type'],
+                   product_code='BUDGET', state={'on_off': False})
+            for target in [room, *extra_rooms] for i in range(10)
+        ])
+        DeviceCommand.objects.bulk_create([
+            DeviceCommand(device_id=self.ids['device'], capability='on_off', parameters={'on_off': True},
+                          status=DeviceCommand.Status.SUCCESS, user=self.owner)
+            for _ in range(20)
+        ])
+        home.members.add(*[
+            User.objects.create_user(email=f'extra-member-{i}@synkro.local', username=f'extra-member-{i}')
+            for i in range(4)
+        ])
+        cache.clear()
+
+        for name in SIZE_INDEPENDENT:
+            with self.subTest(endpoint=name):
+                with self.assertNumQueries(counts[name]):
+                    self.request(*budgets[name])
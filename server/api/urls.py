@@ -9,6 +9,7 @@ api_patterns = [
     path('users/', include('users.urls')),
     path('auth/', include('auth.urls')),
     path('me/', include('users.me_urls')),
+    path('audit/', include('users.audit_urls')),
     path('homes/', include('homes.urls')),
     path('rooms/', include('rooms.urls')),
     path('devices/', include('devices.urls')),
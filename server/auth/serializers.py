@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from utils.validators import validate_password as validate_pwd, validate_email
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .tokens import HomeAccessRefreshToken
 
 User = get_user_model()
 
@@ -123,4 +125,12 @@ class PasswordChangeSerializer(serializers.Serializer):
         if data.get('current_password') == data.get('new_password'):
             raise serializers.ValidationError({'new_password': 'New password must be different from the current password.'})
         
-        return data 
\ No newline at end of file
+        return data 
+
+
+class HomeAccessTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = HomeAccessRefreshToken
+
+
+class HomeAccessTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = HomeAccessRefreshToken
@@ -0,0 +1,22 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class HomeAccessRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user's home access
+    (`homes` and `hav` claims, see homes.membership) when
+    HOME_ACCESS_CLAIMS is enabled with a shared cache. The claims are computed each time an
+    access token is issued, so a refresh always gets the current access.
+    """
+
+    no_copy_claims = RefreshToken.no_copy_claims + ('homes', 'hav')
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        from homes.membership import access_claims_enabled, home_access_claims
+        if access_claims_enabled():
+            for claim, value in home_access_claims(self.payload[api_settings.USER_ID_CLAIM]).items():
+                access[claim] = value
+        return access
@@ -2,9 +2,10 @@ from rest_framework import status, views
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import HomeAccessRefreshToken as RefreshToken
 
 from utils.tokens import TokenGenerator
 from utils.emails import send_email
@@ -14,7 +15,8 @@ from .serializers import (
     PasswordChangeSerializer
 )
 from utils.responses import ApiResponse
-from users.models_login_history import LoginHistory
+from users.audit import writer as audit_writer
+from users.points import award_points, POINTS_REGISTER, POINTS_LOGIN
 
 User = get_user_model()
 
@@ -30,12 +32,13 @@ class RegisterView(views.APIView):
             )
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
-                
-            send_email(user, 'email_verification', request=request)
-            user.points += 20
-            user.last_login = timezone.now()
-            user.save()
+            # the account and its queued verification email are committed together
+            with transaction.atomic():
+                user = serializer.save()
+                send_email(user, 'email_verification', request=request)
+                award_points(user, POINTS_REGISTER, 'register')
+                user.last_login = timezone.now()
+                user.save(update_fields=['last_login'])
 
             refresh = RefreshToken.for_user(user)
                 
@@ -76,27 +79,12 @@ class LoginView(views.APIView):
         if serializer.is_valid():
             user = serializer.validated_data['user']
 
-            # Log login event for any login (API or admin)
-            ip = None
-            if request:
-                x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-                if x_forwarded_for:
-                    ip = x_forwarded_for.split(',')[0]
-                else:
-                    ip = request.META.get('REMOTE_ADDR')
-                user_agent = request.META.get('HTTP_USER_AGENT', '')
-            else:
-                user_agent = ''
-            LoginHistory.objects.create(
-                user=user,
-                login_datetime=timezone.now(),
-                ip_address=ip,
-                user_agent=user_agent
-            )
+            # Log login event for any login (API or admin), written in the background
+            audit_writer.record_login(user, request)
 
             user.last_login = timezone.now()
-            user.points += 10
-            user.save()
+            user.save(update_fields=['last_login'])
+            award_points(user, POINTS_LOGIN, 'login')
 
             refresh = RefreshToken.for_user(user)
             return ApiResponse.success(
@@ -146,7 +134,7 @@ class EmailVerifyView(views.APIView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         user.is_email_verified = True
-        user.save()
+        user.save(update_fields=['is_email_verified'])
         return ApiResponse.success(message="Email verified successfully", status_code=status.HTTP_200_OK)
 
 
@@ -164,7 +152,6 @@ class ResendVerificationView(views.APIView):
             )
         
         send_email(user, 'email_verification', request=request)
-        user.save()
         return ApiResponse.success(message="Verification email sent successfully", status_code=status.HTTP_200_OK)
 
 
@@ -177,8 +164,9 @@ class PasswordResetRequestView(views.APIView):
         if serializer.is_valid():
             email = serializer.validated_data['email']
             try:
-                user = User.objects.get(email=email)
-                send_email(user, 'password_reset', request=request)
+                with transaction.atomic():
+                    user = User.objects.get(email=email)
+                    send_email(user, 'password_reset', request=request)
             except User.DoesNotExist:
                 pass
 
@@ -207,7 +195,7 @@ class PasswordResetConfirmView(views.APIView):
                 )
             
             user.set_password(serializer.validated_data['password'])
-            user.save()
+            user.save(update_fields=['password'])
             
             return ApiResponse.success(message="Password reset successful")
         
@@ -231,7 +219,8 @@ class PasswordChangeView(views.APIView):
             new_password = serializer.validated_data['new_password']
             
             user.set_password(new_password)
-            user.save()
+            # request.user can be a cached row: a full save would write back stale points and level
+            user.save(update_fields=['password'])
             
             return ApiResponse.success(message="Password changed successfully")
         
@@ -4,4 +4,6 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+# Serve with an ASGI server (ex: uvicorn config.asgi:application) so the
+# long-lived SSE streams of /homes/<id>/events/ do not hold a worker thread each.
 application = get_asgi_application()
@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Server-Timing header with the SQL count/time of each request, DEBUG only
+    "utils.querycount.QueryCountMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -88,10 +90,38 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # atomic blocks take the write lock at BEGIN, where busy_timeout applies,
+            # instead of failing when a read transaction upgrades to a write
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
+# pragmas run on every new SQLite connection, on top of utils.sqlite.DEFAULT_PRAGMAS
+SQLITE_PRAGMAS = {}
+
+# attempts of the writes wrapped with utils.sqlite.retry_on_locked
+SQLITE_LOCK_RETRIES = 5
+
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "synkro",
+    }
+}
+
+# seconds a resolved home access (owner / member / none) stays cached;
+# only with a shared cache (Redis, Memcached, database), the DB is asked every time with LocMemCache
+HOME_ACCESS_CACHE_TTL = 300
+
+# seconds a home snapshot stays cached; writes to the home change its key right away
+HOME_SNAPSHOT_CACHE_TTL = 300
+
+# seconds an authenticated user row stays cached (invalidated on every save/delete);
+# only with a shared cache, the row is read on every request with LocMemCache
+AUTH_USER_CACHE_TTL = 60
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -126,7 +156,7 @@ AUTH_USER_MODEL = "users.User"
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'auth.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -164,10 +194,25 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_OBTAIN_SERIALIZER': 'auth.serializers.HomeAccessTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'auth.serializers.HomeAccessTokenRefreshSerializer',
 }
 
+# access tokens carry the user's home ids and roles, checked by the home
+# permissions without a DB hit while the user's access version is unchanged;
+# requires a shared cache in CACHES (check homes.E001), a LocMemCache is per process
+HOME_ACCESS_CLAIMS = False
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# emails are queued in users.EmailOutbox and sent by a thread of the web process;
+# set to False when `manage.py send_outbox --loop` runs as a separate worker
+EMAIL_OUTBOX_IN_PROCESS = True
+
+# deleted homes and accounts are purged by a thread of the web process;
+# set to False when `manage.py purge_deleted --loop` runs as a separate worker
+DELETION_PURGE_IN_PROCESS = True
+
 SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
@@ -2,43 +2,106 @@
 
 
 from django.contrib import admin
-from .models import Device, DeviceCommand
+from django.urls import reverse
+from django.utils.html import format_html
+from utils.admin import LargeTableAdmin, RecentRowsInline, related_count
+from .device_catalogue import DEVICE_TYPES
+from .models import Device, DeviceCommand, AutomationRule, Scene
 
-class DeviceCommandInline(admin.TabularInline):
+
+class DeviceTypeFilter(admin.SimpleListFilter):
+    """Choices from the device catalogue: no SELECT DISTINCT over the devices table on each changelist load."""
+
+    title = 'type'
+    parameter_name = 'type'
+
+    def lookups(self, request, model_admin):
+        return [(device_type['type'], device_type['name']) for device_type in DEVICE_TYPES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(type=self.value())
+        return queryset
+
+
+class DeviceCommandInline(RecentRowsInline):
     model = DeviceCommand
-    extra = 0
+    max_rows = 20
+    ordering = ('-created_at',)
+    list_select_related = ('device__room', 'user')
     fields = ('capability', 'parameters', 'status', 'executed_at', 'user', 'created_at')
     readonly_fields = ('created_at', 'updated_at', 'executed_at', 'user')
     show_change_link = True
     can_delete = True
     verbose_name = 'Commande'
-    verbose_name_plural = 'Commandes'
+    verbose_name_plural = 'Commandes (20 dernières)'
 
 @admin.register(Device)
-class DeviceAdmin(admin.ModelAdmin):
+class DeviceAdmin(LargeTableAdmin):
     list_display = ('name', 'room', 'type', 'brand', 'product_code', 'created_at', 'updated_at', 'command_count')
-    list_filter = ('room', 'type', 'brand', 'created_at')
+    list_filter = (DeviceTypeFilter, 'created_at')
+    list_select_related = ('room__home',)
     search_fields = ('name', 'room__name', 'type', 'brand', 'product_code')
+    raw_id_fields = ('room',)
     inlines = [DeviceCommandInline]
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'all_commands')
     ordering = ('room', 'name')
     fieldsets = (
         (None, {
             'fields': ('name', 'room', 'type', 'brand', 'product_code', 'state')
         }),
+        ('Commandes', {
+            'fields': ('all_commands',)
+        }),
         ('Dates', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(command_count=related_count(DeviceCommand, 'device'))
+
     def command_count(self, obj):
-        return obj.commands.count()
+        return obj.command_count
     command_count.short_description = 'Nb commandes'
+    command_count.admin_order_field = 'command_count'
+
+    def all_commands(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:devices_devicecommand_changelist')
+        return format_html('<a href="{}?device__id__exact={}">Toutes les commandes ({})</a>', url, obj.pk, obj.command_count)
+    all_commands.short_description = 'Historique'
 
 @admin.register(DeviceCommand)
-class DeviceCommandAdmin(admin.ModelAdmin):
+class DeviceCommandAdmin(LargeTableAdmin):
     list_display = ('capability', 'device', 'user', 'status', 'executed_at', 'created_at')
-    list_filter = ('status', 'capability', 'created_at', 'executed_at')
+    list_filter = ('status', 'created_at', 'executed_at')
+    list_select_related = ('device__room', 'user')
     search_fields = ('capability', 'device__name', 'user__email', 'user__username')
+    raw_id_fields = ('device',)
     readonly_fields = ('created_at', 'updated_at', 'executed_at', 'user')
     ordering = ('-created_at',)
+
+
+@admin.register(AutomationRule)
+class AutomationRuleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'home', 'trigger_device', 'trigger_capability', 'is_active', 'updated_at')
+    list_filter = ('is_active', 'trigger_capability', 'created_at')
+    list_select_related = ('home', 'trigger_device__room')
+    raw_id_fields = ('home', 'trigger_device')
+    search_fields = ('name', 'home__name', 'trigger_device__name')
+    readonly_fields = ('created_at', 'updated_at', 'created_by')
+    ordering = ('home', 'name')
+
+
+@admin.register(Scene)
+class SceneAdmin(admin.ModelAdmin):
+    list_display = ('name', 'home', 'created_by', 'updated_at')
+    list_filter = ('created_at',)
+    list_select_related = ('home', 'created_by')
+    raw_id_fields = ('home',)
+    search_fields = ('name', 'home__name')
+    readonly_fields = ('created_at', 'updated_at', 'created_by')
+    ordering = ('home', 'name')
@@ -0,0 +1,122 @@
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from django.db.models import Count, Max
+
+#automation engine: rules are compiled once and indexed by (device_id, capability)
+
+MAX_CHAIN_DEPTH = 3
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    id: str
+    home_id: str
+    trigger_value: object
+    match_any: bool
+    actions: tuple
+
+    def matches(self, value):
+        return self.match_any or value == self.trigger_value
+
+
+def compile_rule(rule):
+    actions = tuple(
+        (str(action['device']), action['capability'], action.get('value'))
+        for action in rule.actions or []
+    )
+    return CompiledRule(
+        id=str(rule.id),
+        home_id=str(rule.home_id),
+        trigger_value=rule.trigger_value,
+        match_any=rule.trigger_value is None,
+        actions=actions,
+    )
+
+
+class AutomationEngine:
+    """
+    In-memory index of the active automation rules.
+
+    The index is built lazily from one query and dropped on rule edits
+    (see devices.signals). Every process also compares the version of the
+    rules table (row count and latest updated_at, read from the DB) with
+    the one its index was built from, so the edits made by another worker
+    are picked up on its next evaluation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+    def _rules_version(self):
+        from .models import AutomationRule
+        # a deletion changes the count, a creation or an edit the latest updated_at (auto_now)
+        version = AutomationRule.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+        return version['count'], version['latest']
+
+    def _build(self):
+        from .models import AutomationRule
+        index = defaultdict(list)
+        rules = AutomationRule.objects.filter(is_active=True).only(
+            'id', 'home_id', 'trigger_device_id', 'trigger_capability', 'trigger_value', 'actions'
+        )
+        for rule in rules:
+            index[(str(rule.trigger_device_id), rule.trigger_capability)].append(compile_rule(rule))
+        return dict(index)
+
+    def get_index(self):
+        version = self._rules_version()
+        with self._lock:
+            if self._index is None or self._version != version:
+                self._index = self._build()
+                self._version = version
+            return self._index
+
+    def rules_for(self, device_id, capability):
+        return self.get_index().get((str(device_id), capability), [])
+
+    def handle_changes(self, changes, user=None, depth=0):
+        """
+        Evaluate the rules subscribed to the given (device, capability, value)
+        changes and run the resulting actions through the batch command path.
+        """
+        if depth >= MAX_CHAIN_DEPTH:
+            return []
+        index = self.get_index()
+        if not index:
+            return []
+
+        planned = []
+        for device, capability, value in changes:
+            for rule in index.get((str(device.id), capability), []):
+                if rule.matches(value):
+                    planned.extend((rule.home_id, action) for action in rule.actions)
+        if not planned:
+            return []
+
+        from .models import Device
+        targets = Device.objects.select_related('room').in_bulk(
+            {device_id for _, (device_id, _, _) in planned}
+        )
+        targets = {str(pk): device for pk, device in targets.items()}
+        actions = []
+        for home_id, (device_id, capability, value) in planned:
+            device = targets.get(device_id)
+            # a rule can only drive devices of its own home
+            if device is None or str(device.room.home_id) != home_id:
+                continue
+            actions.append((device, capability, value))
+        if not actions:
+            return []
+
+        from .commands import execute_commands
+        return execute_commands(actions, user=user, depth=depth + 1)
+
+
+engine = AutomationEngine()
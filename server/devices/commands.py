@@ -0,0 +1,103 @@
+from django.db import transaction
+from django.utils import timezone
+from .models import Device, DeviceCommand
+from utils.events import bus, DeviceStateChanged, CommandExecuted
+from homes.versioning import bump_home_version
+from utils.sqlite import retry_on_locked
+
+#batch command path: applies many (device, capability, value) actions at once
+
+
+def execute_commands(actions, user=None, depth=0):
+    """
+    Apply a list of (device, capability, value) tuples.
+
+    Device states are written with one bulk_update and the matching
+    DeviceCommand rows with one bulk_create. Actions on capabilities the
+    device does not support are recorded as failed commands.
+    Returns the created DeviceCommand list.
+    """
+    now = timezone.now()
+    devices = {}
+    commands = []
+    changes = []
+
+    for device, capability, value in actions:
+        if capability not in device.capabilities:
+            commands.append(DeviceCommand(
+                device=device,
+                capability=capability,
+                parameters={capability: value},
+                status=DeviceCommand.Status.FAILED,
+                error_message=f"Capability '{capability}' is not supported by this device.",
+                user=user,
+            ))
+            continue
+
+        device = devices.setdefault(device.id, device)
+        if device.state is None:
+            device.state = {}
+        if device.state.get(capability) != value:
+            changes.append((device, capability, value))
+        device.state[capability] = value
+        device.refresh_power()
+        device.updated_at = now
+        commands.append(DeviceCommand(
+            device=device,
+            capability=capability,
+            parameters={capability: value},
+            status=DeviceCommand.Status.SUCCESS,
+            response={"result": "success", "applied": {capability: value}},
+            user=user,
+            executed_at=now,
+        ))
+
+    _write_commands(list(devices.values()), commands)
+
+    publish_commands(commands)
+    applied = {}
+    for device, capability, value in changes:
+        applied.setdefault(device.id, (device, {}))[1][capability] = value
+    for device, device_changes in applied.values():
+        publish_state_change(device, device_changes)
+
+    if changes:
+        from .automation import engine
+        engine.handle_changes(changes, user=user, depth=depth)
+
+    return commands
+
+
+@retry_on_locked
+def _write_commands(devices, commands):
+    with transaction.atomic():
+        if devices:
+            Device.objects.bulk_update(devices, ['state', 'power_kw', 'updated_at'])
+            # bulk_update sends no post_save, so the list ETags are refreshed here
+            bump_home_version(*{device.room.home_id for device in devices})
+        DeviceCommand.objects.bulk_create(commands)
+
+
+def publish_state_change(device, changes):
+    bus.publish(DeviceStateChanged(
+        home_id=str(device.room.home_id),
+        room_id=str(device.room_id),
+        device_id=str(device.id),
+        changes=dict(changes),
+        state=dict(device.state or {}),
+        power_kw=device.power_kw,
+    ))
+
+
+def publish_commands(commands):
+    for command in commands:
+        bus.publish(CommandExecuted(
+            home_id=str(command.device.room.home_id),
+            command_id=str(command.id),
+            device_id=str(command.device_id),
+            capability=command.capability,
+            parameters=command.parameters,
+            status=command.status,
+            error_message=command.error_message,
+            executed_at=command.executed_at,
+        ))
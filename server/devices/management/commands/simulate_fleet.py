@@ -0,0 +1,108 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from devices.device_catalogue import DEVICE_TYPES, DEVICE_TYPE_MAP
+from devices.models import Device
+from devices.simulator import (
+    FleetSimulator, VirtualDevice, build_virtual_fleet, write_to_db, replay_to_api
+)
+from homes.models import Home
+from rooms.models import Room
+
+User = get_user_model()
+
+SIMULATOR_EMAIL = 'simulator@synkro.local'
+DEVICES_PER_ROOM = 50
+
+
+class Command(BaseCommand):
+    help = "Drive a fleet of virtual devices with a discrete-event simulation to generate load."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['db', 'api', 'dry-run'], default='db',
+                            help="db: bulk_create commands, api: replay against the API, dry-run: only count events")
+        parser.add_argument('--home', help="Simulate the devices of an existing home instead of creating a fleet")
+        parser.add_argument('--devices', type=int, default=1000, help="Size of the generated fleet")
+        parser.add_argument('--hours', type=float, default=24.0, help="Simulated duration in hours")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--speed', type=float, default=60.0,
+                            help="api mode: simulated seconds per wall-clock second")
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--token', help="api mode: JWT access token of a member of the home")
+
+    def handle(self, *args, **options):
+        duration = options['hours'] * 3600
+        mode = options['mode']
+
+        if mode == 'dry-run':
+            fleet = build_virtual_fleet(options['devices'], seed=options['seed'])
+        else:
+            fleet = self._load_fleet(options)
+        if not fleet:
+            raise CommandError("No devices to simulate.")
+
+        simulator = FleetSimulator(fleet, seed=options['seed'])
+        commands = simulator.run(duration)
+
+        if mode == 'dry-run':
+            total = sum(1 for _ in commands)
+            self.stdout.write(f"{total} commands for {len(fleet)} devices over {options['hours']}h")
+        elif mode == 'db':
+            # commands are dated in the past so they feed the consumption views
+            start = timezone.now() - timedelta(seconds=duration)
+            with transaction.atomic():
+                total = write_to_db(
+                    {device.device_id: device for device in fleet}, commands, start,
+                    batch_size=options['batch_size']
+                )
+            self.stdout.write(self.style.SUCCESS(f"{total} commands written for {len(fleet)} devices"))
+        else:
+            if not options['token']:
+                raise CommandError("--token is required in api mode.")
+            sent, failed = replay_to_api(commands, options['base_url'], options['token'], speed=options['speed'])
+            self.stdout.write(self.style.SUCCESS(f"{sent} commands sent, {failed} failed"))
+
+    def _load_fleet(self, options):
+        if options['home']:
+            devices = Device.objects.filter(room__home_id=options['home']).select_related('room')
+        else:
+            devices = self._create_fleet(options['devices'])
+        return [
+            VirtualDevice(
+                device_id=str(device.id),
+                type=device.type,
+                home_id=str(device.room.home_id),
+                room_id=str(device.room_id),
+                state=dict(device.state or {}),
+            )
+            for device in devices
+        ]
+
+    @transaction.atomic
+    def _create_fleet(self, count):
+        owner = User.objects.filter(email=SIMULATOR_EMAIL).first()
+        if owner is None:
+            owner = User.objects.create_user(email=SIMULATOR_EMAIL, username='simulator', password=None)
+        home = Home.objects.create(name=f"Simulated fleet ({count} devices)", owner=owner)
+        rooms = Room.objects.bulk_create([
+            Room(name=f"Room {i + 1}", home=home)
+            for i in range((count + DEVICES_PER_ROOM - 1) // DEVICES_PER_ROOM)
+        ])
+        devices = []
+        for i in range(count):
+            device_type = DEVICE_TYPES[i % len(DEVICE_TYPES)]
+            capabilities = DEVICE_TYPE_MAP[device_type['type']]['capabilities']
+            devices.append(Device(
+                name=f"{device_type['name']} {i + 1}",
+                room=rooms[i // DEVICES_PER_ROOM],
+                type=device_type['type'],
+                product_code='SIM000',
+                brand=device_type.get('brand'),
+                state={cap: None for cap in capabilities},
+            ))
+        Device.objects.bulk_create(devices, batch_size=1000)
+        self.stdout.write(f"Created home {home.id} with {len(rooms)} rooms and {count} devices")
+        return devices
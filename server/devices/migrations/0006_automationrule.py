@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-19 04:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0005_deviceconsumptionhistory'),
+        ('homes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutomationRule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('trigger_capability', models.CharField(max_length=50)),
+                ('trigger_value', models.JSONField(blank=True, null=True)),
+                ('actions', models.JSONField(default=list)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='automation_rules', to=settings.AUTH_USER_MODEL)),
+                ('home', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='automation_rules', to='homes.home')),
+                ('trigger_device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='automation_triggers', to='devices.device')),
+            ],
+            options={
+                'verbose_name': 'Automation Rule',
+                'verbose_name_plural': 'Automation Rules',
+                'ordering': ['home', 'name'],
+                'unique_together': {('home', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 04:12
+
+from django.db import migrations, models
+
+
+def fill_power_kw(apps, schema_editor):
+    from devices.power import current_power_kw
+    Device = apps.get_model('devices', 'Device')
+    devices = list(Device.objects.only('id', 'type', 'state'))
+    for device in devices:
+        device.power_kw = current_power_kw(device.type, device.state)
+    Device.objects.bulk_update(devices, ['power_kw'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0007_scene'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='power_kw',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.RunPython(fill_power_kw, migrations.RunPython.noop),
+    ]
@@ -19,12 +19,26 @@ class Device(models.Model):
     product_code = models.CharField(max_length=6)
     brand = models.CharField(max_length=100, null=True, blank=True)
     state = models.JSONField(default=dict, blank=True)  
+    # current power draw derived from state, stored so that totals are a SUM() (see power.py)
+    power_kw = models.FloatField(default=0.0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} in {self.room.name}"
 
+    def refresh_power(self):
+        from .power import current_power_kw
+        self.power_kw = current_power_kw(self.type, self.state)
+        return self.power_kw
+
+    def save(self, *args, **kwargs):
+        self.refresh_power()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'state' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'power_kw'}
+        super().save(*args, **kwargs)
+
     #capabilities are the actions that can be performed on the device
     @property
     def capabilities(self):
@@ -97,3 +111,79 @@ class DeviceCommand(models.Model):
         verbose_name = 'Device Command'
         verbose_name_plural = 'Device Commands'
         ordering = ['-created_at']
+
+
+class AutomationRule(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100)
+    home = models.ForeignKey(
+        'homes.Home',
+        on_delete=models.CASCADE,
+        related_name='automation_rules'
+    )
+    trigger_device = models.ForeignKey(
+        Device,
+        on_delete=models.CASCADE,
+        related_name='automation_triggers'
+    )
+    trigger_capability = models.CharField(max_length=50)
+    # null means "any change" of the capability
+    trigger_value = models.JSONField(null=True, blank=True)
+    # ex: [{"device": "<uuid>", "capability": "on_off", "value": true}]
+    actions = models.JSONField(default=list)
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name='automation_rules',
+        null=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.trigger_capability} on {self.trigger_device_id})"
+
+    class Meta:
+        verbose_name = 'Automation Rule'
+        verbose_name_plural = 'Automation Rules'
+        ordering = ['home', 'name']
+        unique_together = ('home', 'name')
+
+
+class Scene(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100)
+    home = models.ForeignKey(
+        'homes.Home',
+        on_delete=models.CASCADE,
+        related_name='scenes'
+    )
+    # target states by device, ex: {"<device uuid>": {"on_off": true, "brightness": 30}}
+    states = models.JSONField(default=dict)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name='scenes',
+        null=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} in {self.home.name}"
+
+    def compiled_actions(self, devices):
+        """Flatten the stored states into (device, capability, value) actions for the batch command path."""
+        return [
+            (devices[device_id], capability, value)
+            for device_id, target in self.states.items()
+            if device_id in devices
+            for capability, value in target.items()
+        ]
+
+    class Meta:
+        verbose_name = 'Scene'
+        verbose_name_plural = 'Scenes'
+        ordering = ['home', 'name']
+        unique_together = ('home', 'name')
@@ -0,0 +1,86 @@
+#power model: instantaneous power draw of a device from its type and state
+
+#Local mapping of device type to power
+DEVICE_TYPE_POWER = {
+    "smart_bulb_x": 0.07,        # 70W
+    "smart_thermostat_x": 0.05,  # 50W
+    "smart_shutter_x": 0,        # no consumption
+    "smart_television_x": 0.1,   # 100W
+    "smart_oven_x": 1.8,         # 1800W
+    "smart_doorlocker_x": 0,     # no consumption
+    "smart_speaker_x": 0.02,     # 20W
+    "security_camera_x": 0.03,   # 30W
+    "smart_fridge_x": 0.25,      # 250W or 150W depending on the mode
+    "dish_washer": 2,            # 2000W
+    "washing_machine": 2.5,       # 2500W
+}
+
+OFF_VALUES = [None, False, 0, 'off', 'Off', 'OFF', 'false', 'False', 'FALSE']
+
+
+def _cycle_coef(cycle):
+    if cycle == 'Eco':
+        return 0.9
+    if cycle == 'Quick':
+        return 1.2
+    return 1
+
+
+def running_power_kw(device_type, state):
+    """Power in kW drawn by a device of this type while it is on, with the settings of `state`."""
+    state = state or {}
+    power_kw = DEVICE_TYPE_POWER.get(device_type, 0)
+
+    if device_type == 'smart_bulb_x':
+        brightness = state.get('brightness', 100)
+        if brightness is not None and isinstance(brightness, (int, float)):
+            power_kw *= (brightness / 100)
+
+    elif device_type == 'smart_thermostat_x':
+        temperature = state.get('temperature', 100)
+        if temperature is not None and isinstance(temperature, (int, float)):
+            distance = abs(temperature - 50)
+            power_kw *= 0.2 + (distance / 50) * (1 - 0.2)
+
+    elif device_type == 'dish_washer':
+        temperature = state.get('temperature', 100)
+        coef = _cycle_coef(state.get('cycle_selection', 'Normal'))
+        if temperature is not None and isinstance(temperature, (int, float)):
+            power_kw *= coef * ((50 + temperature) / 150)
+        else:
+            power_kw *= coef
+
+    elif device_type == 'washing_machine':
+        temperature = state.get('temperature', 100)
+        spin_speed_control = state.get('spin_speed_control', 2000)
+        coef = _cycle_coef(state.get('cycle_selection', 'Normal'))
+        if temperature is not None and isinstance(temperature, (int, float)):
+            power_kw *= coef * ((50 + temperature) / 150) * (spin_speed_control / 2000)
+        else:
+            power_kw *= coef
+
+    elif device_type == 'smart_oven_x':
+        heat = state.get('heat', 0)
+        if heat is not None and isinstance(heat, (int, float)) and 50 <= heat <= 250:
+            power_kw *= (heat / 250)
+        else:
+            power_kw = 0.0
+
+    elif device_type == 'smart_fridge_x':
+        on_off = state.get('on_off', True)
+        power = state.get('power', 'on')
+        if (on_off is not None and on_off) or (power is not None and power == 'on'):
+            power_kw = 0.15 if state.get('mode', 'normal') == 'eco' else 0.25
+        else:
+            power_kw = 0.0
+
+    return power_kw
+
+
+def current_power_kw(device_type, state):
+    """Power in kW drawn right now: 0 when the device is off, its running power otherwise."""
+    state = state or {}
+    power = state.get('power', None)
+    if state.get('on_off', None) in OFF_VALUES or (power is not None and power != 'on'):
+        return 0.0
+    return round(running_power_kw(device_type, state), 5)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import queue
+import threading
+from collections import defaultdict
+from django.core.serializers.json import DjangoJSONEncoder
+
+#push channel: in-process fan-out of home events to the SSE streams (see views.home_event_stream)
+#fed by the event bus (see devices.signals)
+#single process only: a stream never sees the events published by another worker (see the README)
+
+QUEUE_SIZE = 256
+
+
+class _AsyncSubscriber:
+    """Stream served by an ASGI server: an asyncio queue fed from the publishing thread."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def offer(self, message):
+        self.loop.call_soon_threadsafe(_offer, self.queue, message)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _ThreadSubscriber:
+    """Stream served by a WSGI server (runserver, gunicorn): a blocking queue read by the worker thread."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+    def offer(self, message):
+        _offer(self.queue, message)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class HomeEventBroker:
+    """
+    Keeps one queue per open stream, grouped by home.
+
+    publish() can be called from the sync views (worker threads): an ASGI
+    stream gets its events through its event loop, a WSGI stream through a
+    thread-safe queue. Subscribers are per process, so every worker serves
+    the streams opened on it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, home_id, asynchronous=True):
+        subscriber = _AsyncSubscriber() if asynchronous else _ThreadSubscriber()
+        with self._lock:
+            self._subscribers[str(home_id)].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, home_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(str(home_id))
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[str(home_id)]
+
+    def has_subscribers(self, home_id):
+        return bool(self._subscribers.get(str(home_id)))
+
+    def publish(self, home_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(home_id), ()))
+        if not subscribers:
+            return
+        message = {'event': event, 'data': json.dumps(data, cls=DjangoJSONEncoder)}
+        for subscriber in subscribers:
+            subscriber.offer(message)
+
+
+def _offer(queue, message):
+    # a slow client loses events instead of growing the queue forever
+    if not queue.full():
+        queue.put_nowait(message)
+
+
+broker = HomeEventBroker()
+
+
+EVENT_NAMES = {
+    'DeviceStateChanged': 'device_state',
+    'CommandExecuted': 'command',
+    'ConsumptionRecorded': 'consumption',
+    'MemberAdded': 'member_added',
+    'MemberRemoved': 'member_removed',
+}
+
+
+def forward_events(events):
+    """Async event bus subscriber: forwards a batch of domain events to the open streams."""
+    for event in events:
+        home_id = event.home_id
+        if not broker.has_subscribers(home_id):
+            continue
+        name = EVENT_NAMES[type(event).__name__]
+        if name == 'device_state':
+            broker.publish(home_id, name, {
+                'device_id': event.device_id,
+                'room_id': event.room_id,
+                'changes': event.changes,
+                'state': event.state,
+            })
+            broker.publish(home_id, 'power', {'device_id': event.device_id, 'power_kw': event.power_kw})
+        elif name == 'command':
+            broker.publish(home_id, name, {
+                'id': event.command_id,
+                'device_id': event.device_id,
+                'capability': event.capability,
+                'parameters': event.parameters,
+                'status': event.status,
+                'error_message': event.error_message,
+                'executed_at': event.executed_at,
+            })
+        elif name == 'consumption':
+            broker.publish(home_id, name, {**event.reading, 'device_id': event.device_id})
+        else:
+            broker.publish(home_id, name, {'user_id': event.user_id})
+
+
+def format_sse(message):
+    return f"event: {message['event']}\ndata: {message['data']}\n\n"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Device, DeviceCommand, DeviceConsumptionHistory
+from django.core.exceptions import ValidationError as DjangoValidationError
+from .models import Device, DeviceCommand, DeviceConsumptionHistory, AutomationRule, Scene
 from .device_catalogue import DEVICE_TYPE_MAP
 
 #serializers are used to convert complex data types, such as querysets and model instances, into native Python datatypes that can then be easily rendered into JSON, XML, or other content types.
@@ -27,87 +28,8 @@ class DeviceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'capabilities', 'energyConsumption']
 
     def get_energyConsumption(self, obj):
-        # same logic as EnergyConsumptionView in views.py
-        from .views import DEVICE_TYPE_POWER
-        device_state = obj.state or {}
-        type_ = getattr(obj, 'type', None)
-        power_kw = DEVICE_TYPE_POWER.get(type_, 0)
-
-        # Check if device is off (is so, return 0)
-        on_off = device_state.get('on_off', None)
-        power = device_state.get('power', None)
-        if (on_off in [None, False, 0, 'off', 'Off', 'OFF', 'false', 'False', 'FALSE']) or (power is not None and power != 'on'):
-            return 0.0
-
-        # do consumption for each device type
-        if type_ == 'smart_bulb_x':
-            brightness = device_state.get('brightness', 100)
-            if brightness is not None and isinstance(brightness, (int, float)):
-                power_kw *= (brightness / 100)
-            else:
-                power_kw *= 1
-        
-        elif type_ == 'smart_thermostat_x':
-            temperature = device_state.get('temperature', 100)
-            if temperature is not None and isinstance(temperature, (int, float)):
-                distance = abs(temperature - 50)
-                power_kw *= 0.2 + (distance / 50) * (1 - 0.2)
-            else:
-                power_kw *= 1
-        
-        elif type_ == 'dish_washer':
-            temperature = device_state.get('temperature', 100)
-            cycle = device_state.get('cycle_selection', 'Normal')
-            if cycle == 'Normal':
-                coef = 1
-            elif cycle == 'Eco':
-                coef = 0.9
-            elif cycle == 'Quick':
-                coef = 1.2
-            else:
-                coef = 1
-            if temperature is not None and isinstance(temperature, (int, float)):
-                power_kw *= coef * ((50 + temperature) / 150)
-            else:
-                power_kw *= coef
-        
-        elif type_ == 'washing_machine':
-            temperature = device_state.get('temperature', 100)
-            spin_speed_control = device_state.get('spin_speed_control', 2000)
-            cycle = device_state.get('cycle_selection', 'Normal')
-            if cycle == 'Normal':
-                coef = 1
-            elif cycle == 'Eco':
-                coef = 0.9
-            elif cycle == 'Quick':
-                coef = 1.2
-            else:
-                coef = 1
-            if temperature is not None and isinstance(temperature, (int, float)):
-                power_kw *= coef * ((50 + temperature) / 150) * (spin_speed_control / 2000)
-            else:
-                power_kw *= coef
-        
-        elif type_ == 'smart_oven_x':
-            heat = device_state.get('heat', 0)
-            if heat is not None and isinstance(heat, (int, float)) and 50 <= heat <= 250:
-                power_kw *= (heat / 250)
-            else:
-                power_kw = 0.0
-        
-        elif type_ == 'smart_fridge_x':
-            mode = device_state.get('mode', 'normal')
-            on_off = device_state.get('on_off', True)
-            power = device_state.get('power', 'on')
-            if (on_off is not None and on_off) or (power is not None and power == 'on'):
-                if mode == 'eco':
-                    power_kw = 0.15
-                else:
-                    power_kw = 0.25
-            else:
-                power_kw = 0.0
-
-        return round(power_kw, 5)
+        # stored by Device.save / execute_commands from the power model
+        return obj.power_kw
 
 
     def get_capabilities(self, obj):
@@ -177,3 +99,111 @@ class DeviceCommandSerializer(serializers.ModelSerializer):
         validated_data['device'] = device
         validated_data['status'] = DeviceCommand.Status.PENDING
         return super().create(validated_data)
+
+
+class AutomationRuleSerializer(serializers.ModelSerializer):
+    trigger_device = serializers.PrimaryKeyRelatedField(queryset=Device.objects.all())
+
+    class Meta:
+        model = AutomationRule
+        fields = [
+            'id', 'name', 'home', 'trigger_device', 'trigger_capability', 'trigger_value',
+            'actions', 'is_active', 'created_by', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'home', 'created_by', 'created_at', 'updated_at']
+
+    def validate_trigger_device(self, value):
+        home = self.context['home']
+        if value.room.home_id != home.id:
+            raise serializers.ValidationError("The trigger device must belong to this home.")
+        return value
+
+    def validate_actions(self, value):
+        if not isinstance(value, list) or not value:
+            raise serializers.ValidationError("Actions must be a non-empty list.")
+        home = self.context['home']
+        device_ids = set()
+        for action in value:
+            if not isinstance(action, dict) or 'device' not in action or 'capability' not in action:
+                raise serializers.ValidationError("Each action needs a 'device' and a 'capability'.")
+            device_ids.add(str(action['device']))
+        try:
+            devices = {
+                str(device.id): device
+                for device in Device.objects.filter(id__in=device_ids, room__home=home)
+            }
+        except (ValueError, DjangoValidationError):
+            raise serializers.ValidationError("Invalid device id in actions.")
+        for action in value:
+            device = devices.get(str(action['device']))
+            if device is None:
+                raise serializers.ValidationError(f"Device '{action['device']}' does not belong to this home.")
+            if action['capability'] not in device.capabilities:
+                raise serializers.ValidationError(
+                    f"'{action['capability']}' is not a valid capability for type '{device.type}'"
+                )
+        return [
+            {'device': str(action['device']), 'capability': action['capability'], 'value': action.get('value')}
+            for action in value
+        ]
+
+    def validate(self, attrs):
+        device = attrs.get('trigger_device') or getattr(self.instance, 'trigger_device', None)
+        capability = attrs.get('trigger_capability') or getattr(self.instance, 'trigger_capability', None)
+        if device and capability not in device.capabilities:
+            raise serializers.ValidationError(
+                {'trigger_capability': f"'{capability}' is not a valid capability for type '{device.type}'"}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['home'] = self.context['home']
+        validated_data['created_by'] = self.context['request'].user
+        return super().create(validated_data)
+
+
+class SceneSerializer(serializers.ModelSerializer):
+    devices_count = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = Scene
+        fields = ['id', 'name', 'home', 'states', 'devices_count', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'home', 'devices_count', 'created_by', 'created_at', 'updated_at']
+
+    def get_devices_count(self, obj):
+        return len(obj.states or {})
+
+    def validate_name(self, value):
+        if len(value) > 100:
+            raise serializers.ValidationError("Scene name must be less than 100 characters.")
+        return value
+
+    def validate_states(self, value):
+        if not isinstance(value, dict) or not value:
+            raise serializers.ValidationError("States must be a non-empty JSON object keyed by device id.")
+        home = self.context['home']
+        try:
+            devices = {
+                str(device.id): device
+                for device in Device.objects.filter(id__in=list(value.keys()), room__home=home).only('id', 'type')
+            }
+        except (ValueError, DjangoValidationError):
+            raise serializers.ValidationError("Invalid device id in states.")
+        states = {}
+        for device_id, target in value.items():
+            device = devices.get(str(device_id))
+            if device is None:
+                raise serializers.ValidationError(f"Device '{device_id}' does not belong to this home.")
+            if not isinstance(target, dict) or not target:
+                raise serializers.ValidationError(f"Target state for device '{device_id}' must be a non-empty JSON object.")
+            capabilities = DEVICE_TYPE_MAP.get(device.type, {}).get('capabilities', [])
+            for key in target:
+                if key not in capabilities:
+                    raise serializers.ValidationError(f"'{key}' is not a valid capability for type '{device.type}'")
+            states[str(device.id)] = target
+        return states
+
+    def create(self, validated_data):
+        validated_data['home'] = self.context['home']
+        validated_data['created_by'] = self.context['request'].user
+        return super().create(validated_data)
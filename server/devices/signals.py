@@ -0,0 +1,18 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from utils.events import bus, DeviceStateChanged, CommandExecuted, ConsumptionRecorded, MemberAdded, MemberRemoved
+from .push import forward_events
+
+
+@receiver(post_save, sender='devices.AutomationRule')
+@receiver(post_delete, sender='devices.AutomationRule')
+def invalidate_automation_index(sender, **kwargs):
+    from .automation import engine
+    engine.invalidate()
+
+
+bus.subscribe(DeviceStateChanged, forward_events, asynchronous=True)
+bus.subscribe(CommandExecuted, forward_events, asynchronous=True)
+bus.subscribe(ConsumptionRecorded, forward_events, asynchronous=True)
+bus.subscribe(MemberAdded, forward_events, asynchronous=True)
+bus.subscribe(MemberRemoved, forward_events, asynchronous=True)
@@ -0,0 +1,214 @@
+import heapq
+import json
+import random
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from .device_catalogue import DEVICE_TYPES, DEVICE_TYPE_MAP
+
+#discrete-event simulator of a device fleet, used to generate realistic load
+
+# mean durations in seconds: how long a device stays on, stays off,
+# and how often its other capabilities are adjusted while on
+USAGE_PROFILES = {
+    "smart_bulb_x": {"on_mean": 2 * 3600, "off_mean": 6 * 3600, "adjust_mean": 30 * 60},
+    "smart_thermostat_x": {"on_mean": 8 * 3600, "off_mean": 4 * 3600, "adjust_mean": 2 * 3600},
+    "smart_shutter_x": {"on_mean": 10 * 3600, "off_mean": 12 * 3600, "adjust_mean": 3 * 3600},
+    "smart_television_x": {"on_mean": 2 * 3600, "off_mean": 10 * 3600, "adjust_mean": 10 * 60},
+    "smart_oven_x": {"on_mean": 45 * 60, "off_mean": 20 * 3600, "adjust_mean": 15 * 60},
+    "smart_fridge_x": {"on_mean": 7 * 24 * 3600, "off_mean": 10 * 60, "adjust_mean": 12 * 3600},
+    "smart_doorlocker_x": {"on_mean": 6 * 3600, "off_mean": 15 * 60, "adjust_mean": None},
+    "smart_speaker_x": {"on_mean": 90 * 60, "off_mean": 8 * 3600, "adjust_mean": 4 * 60},
+    "security_camera_x": {"on_mean": 20 * 3600, "off_mean": 2 * 3600, "adjust_mean": 6 * 3600},
+    "dish_washer": {"on_mean": 2 * 3600, "off_mean": 22 * 3600, "adjust_mean": None},
+    "washing_machine": {"on_mean": 90 * 60, "off_mean": 30 * 3600, "adjust_mean": None},
+}
+DEFAULT_PROFILE = {"on_mean": 3600, "off_mean": 6 * 3600, "adjust_mean": None}
+
+CAPABILITY_VALUES = {
+    "brightness": lambda rng: rng.randint(10, 100),
+    "color": lambda rng: rng.choice(["#FFFFFF", "#FFD27F", "#FF8C00", "#87CEEB", "#FF69B4"]),
+    "temperature": lambda rng: rng.randint(16, 26),
+    "position": lambda rng: rng.randint(0, 100),
+    "volume": lambda rng: rng.randint(0, 100),
+    "channel": lambda rng: rng.randint(1, 50),
+    "heat": lambda rng: rng.randint(50, 250),
+    "mode": lambda rng: rng.choice(["normal", "eco"]),
+    "trackIndex": lambda rng: rng.randint(0, 20),
+    "video_stream": lambda rng: rng.choice([True, False]),
+    "motion_detection": lambda rng: rng.choice([True, False]),
+    "cycle_selection": lambda rng: rng.choice(["Normal", "Eco", "Quick"]),
+    "spin_speed_control": lambda rng: rng.choice([400, 800, 1200, 1600]),
+}
+
+# event kinds
+TOGGLE = 0
+ADJUST = 1
+
+
+@dataclass
+class VirtualDevice:
+    device_id: str
+    type: str
+    home_id: Optional[str] = None
+    room_id: Optional[str] = None
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def capabilities(self):
+        return DEVICE_TYPE_MAP.get(self.type, {}).get("capabilities", [])
+
+    @property
+    def profile(self):
+        return USAGE_PROFILES.get(self.type, DEFAULT_PROFILE)
+
+
+@dataclass(frozen=True)
+class SimulatedCommand:
+    offset: float  # seconds since the start of the simulation
+    device: VirtualDevice
+    capability: str
+    value: Any
+
+
+class FleetSimulator:
+    """
+    Heap-based discrete-event loop over a fleet of virtual devices.
+
+    Every device has at most one pending TOGGLE event (on/off with
+    exponential durations from its usage profile) and, while on, one
+    pending ADJUST event for its other capabilities. Events are popped in
+    time order, so the output is a time-sorted command stream.
+    """
+
+    def __init__(self, devices: List[VirtualDevice], seed: Optional[int] = None):
+        self.devices = devices
+        self.rng = random.Random(seed)
+        self._queue = []
+        self._seq = 0
+
+    def _schedule(self, at, device_index, kind):
+        # seq breaks ties so the heap never compares devices
+        heapq.heappush(self._queue, (at, self._seq, device_index, kind))
+        self._seq += 1
+
+    def _delay(self, mean):
+        return self.rng.expovariate(1.0 / mean)
+
+    def _adjustable(self, device):
+        return [cap for cap in device.capabilities if cap != "on_off" and cap in CAPABILITY_VALUES]
+
+    def run(self, duration):
+        """Yield SimulatedCommand objects for `duration` simulated seconds."""
+        self._queue = []
+        for index, device in enumerate(self.devices):
+            if "on_off" not in device.capabilities:
+                continue
+            is_on = bool(device.state.get("on_off"))
+            mean = device.profile["on_mean"] if is_on else device.profile["off_mean"]
+            self._schedule(self._delay(mean), index, TOGGLE)
+
+        while self._queue:
+            at, _, index, kind = heapq.heappop(self._queue)
+            if at > duration:
+                break
+            device = self.devices[index]
+            profile = device.profile
+
+            if kind == TOGGLE:
+                is_on = not device.state.get("on_off")
+                device.state["on_off"] = is_on
+                yield SimulatedCommand(at, device, "on_off", is_on)
+                self._schedule(at + self._delay(profile["on_mean"] if is_on else profile["off_mean"]), index, TOGGLE)
+                if is_on and profile["adjust_mean"] and self._adjustable(device):
+                    self._schedule(at + self._delay(profile["adjust_mean"]), index, ADJUST)
+            elif device.state.get("on_off"):
+                # stale ADJUST events of a device switched off in the meantime are dropped
+                capability = self.rng.choice(self._adjustable(device))
+                value = CAPABILITY_VALUES[capability](self.rng)
+                device.state[capability] = value
+                yield SimulatedCommand(at, device, capability, value)
+                self._schedule(at + self._delay(profile["adjust_mean"]), index, ADJUST)
+
+
+def build_virtual_fleet(count, seed=None):
+    """Virtual devices spread evenly over the catalogue types."""
+    rng = random.Random(seed)
+    types = [d["type"] for d in DEVICE_TYPES]
+    return [
+        VirtualDevice(device_id=str(i), type=types[i % len(types)], state={"on_off": rng.random() < 0.2})
+        for i in range(count)
+    ]
+
+
+def write_to_db(devices_by_id, commands, start, user=None, batch_size=1000):
+    """
+    Persist simulated commands with bulk_create and the final device states
+    with one bulk_update. Returns the number of commands written.
+    """
+    from .models import Device, DeviceCommand
+
+    buffer = []
+    written = 0
+    for command in commands:
+        executed_at = start + timedelta(seconds=command.offset)
+        buffer.append(DeviceCommand(
+            device_id=command.device.device_id,
+            capability=command.capability,
+            parameters={command.capability: command.value},
+            status=DeviceCommand.Status.SUCCESS,
+            response={"result": "success", "applied": {command.capability: command.value}, "simulated": True},
+            user=user,
+            executed_at=executed_at,
+        ))
+        if len(buffer) >= batch_size:
+            DeviceCommand.objects.bulk_create(buffer)
+            written += len(buffer)
+            buffer = []
+    if buffer:
+        DeviceCommand.objects.bulk_create(buffer)
+        written += len(buffer)
+
+    from homes.versioning import bump_home_version
+    devices = list(Device.objects.filter(id__in=list(devices_by_id.keys())).select_related('room'))
+    for device in devices:
+        device.state = {**(device.state or {}), **devices_by_id[str(device.id)].state}
+        device.refresh_power()
+    Device.objects.bulk_update(devices, ['state', 'power_kw'], batch_size=batch_size)
+    bump_home_version(*{device.room.home_id for device in devices})
+    return written
+
+
+def replay_to_api(commands, base_url, token, speed=60.0, timeout=10):
+    """
+    Send simulated commands to the command endpoint, spacing them by their
+    simulated offsets divided by `speed`. Returns (sent, failed).
+    """
+    sent = failed = 0
+    started = time.monotonic()
+    for command in commands:
+        delay = command.offset / speed - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+        device = command.device
+        url = (
+            f"{base_url.rstrip('/')}/homes/{device.home_id}/rooms/{device.room_id}"
+            f"/devices/{device.device_id}/commands/"
+        )
+        body = json.dumps({
+            "capability": command.capability,
+            "parameters": {command.capability: command.value},
+        }).encode()
+        request = urllib.request.Request(url, data=body, method="POST", headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}",
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=timeout):
+                sent += 1
+        except OSError:
+            failed += 1
+    return sent, failed
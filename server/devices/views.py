@@ -1,12 +1,26 @@
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.shortcuts import get_object_or_404
-from .models import Device, DeviceCommand, DeviceConsumptionHistory
-from rooms.models import Room
-from .serializers import DeviceSerializer, DeviceCommandSerializer, DeviceConsumptionHistorySerializer
+from .models import Device, DeviceCommand, DeviceConsumptionHistory, AutomationRule, Scene
+from .serializers import DeviceSerializer, DeviceCommandSerializer, DeviceConsumptionHistorySerializer, AutomationRuleSerializer, SceneSerializer
+from .commands import execute_commands, publish_state_change, publish_commands
+from .power import running_power_kw
+from . import push
+from utils.events import bus, DeviceCreated, ConsumptionRecorded
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from auth.authentication import CachedJWTAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .automation import engine as automation_engine
 from utils.responses import ApiResponse
+from users.points import award_points, POINTS_DEVICE_CREATED
 from utils.permissions import IsHomeOwnerOrMember
+from utils.conditional import ConditionalListMixin
+from utils.hierarchy import HomeHierarchyMixin
+from homes.versioning import get_home_version, get_room_home_version
+from homes.membership import can_access_home
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.generics import ListAPIView, GenericAPIView
@@ -14,19 +28,18 @@ from rest_framework.response import Response
 from .device_catalogue import DEVICE_TYPES
 from rest_framework.views import APIView
 from django.utils.dateparse import parse_datetime
-from django.db.models import Q
+from django.db.models import Count, Q, Sum
 from datetime import datetime, timedelta, timezone
 import pytz
 from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from users.models_action_history import ActionHistory
 
 User = get_user_model()
 
 
 
-class HomeDeviceListView(ListAPIView):
+class HomeDeviceListView(ConditionalListMixin, ListAPIView):
     serializer_class = DeviceSerializer
     permission_classes = [IsHomeOwnerOrMember]
 
@@ -34,7 +47,10 @@ class HomeDeviceListView(ListAPIView):
         home_pk = self.kwargs['home_pk']
         return Device.objects.filter(room__home__id=home_pk)
 
-class RoomDeviceListView(ListAPIView):
+    def get_list_version(self):
+        return get_home_version(self.kwargs['home_pk'])
+
+class RoomDeviceListView(ConditionalListMixin, ListAPIView):
     serializer_class = DeviceSerializer
     permission_classes = [IsHomeOwnerOrMember]
 
@@ -42,6 +58,41 @@ class RoomDeviceListView(ListAPIView):
         room_pk = self.kwargs['room_pk']
         return Device.objects.filter(room__id=room_pk)
 
+    def get_list_version(self):
+        return get_room_home_version(self.kwargs['room_pk'])
+
+
+class PowerSummaryView(APIView):
+    """Current power draw of a home, per room, or of a single room, summed from Device.power_kw."""
+    permission_classes = [IsHomeOwnerOrMember]
+
+    def get(self, request, home_pk, room_pk=None):
+        devices = Device.objects.filter(room__home__id=home_pk)
+        if room_pk:
+            totals = devices.filter(room__id=room_pk).aggregate(
+                total_kw=Sum('power_kw'),
+                devices_on=Count('id', filter=Q(power_kw__gt=0))
+            )
+            return ApiResponse.success({
+                'room_id': room_pk,
+                'power_kw': round(totals['total_kw'] or 0.0, 5),
+                'devices_on': totals['devices_on'],
+            })
+        rooms = devices.values('room_id').annotate(
+            total_kw=Sum('power_kw'),
+            devices_on=Count('id', filter=Q(power_kw__gt=0))
+        ).order_by('room_id')
+        rooms = [
+            {'room_id': row['room_id'], 'power_kw': round(row['total_kw'] or 0.0, 5), 'devices_on': row['devices_on']}
+            for row in rooms
+        ]
+        return ApiResponse.success({
+            'home_id': home_pk,
+            'power_kw': round(sum(room['power_kw'] for room in rooms), 5),
+            'devices_on': sum(room['devices_on'] for room in rooms),
+            'rooms': rooms,
+        })
+
 
 class DeviceTypePublicListView(GenericAPIView):
     permission_classes = [AllowAny]
@@ -49,7 +100,7 @@ class DeviceTypePublicListView(GenericAPIView):
         device_types = [{**d, "id": d["type"]} for d in DEVICE_TYPES]
         return Response(device_types)
 
-class DeviceViewSet(viewsets.ModelViewSet):
+class DeviceViewSet(HomeHierarchyMixin, ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = DeviceSerializer
     permission_classes = [IsHomeOwnerOrMember]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -57,18 +108,22 @@ class DeviceViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'product_code']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    hierarchy_pk_level = 'device'
 
     def get_queryset(self):
-        room_pk = self.kwargs.get('room_pk')
-        return Device.objects.filter(room__id=room_pk)
+        return Device.objects.filter(
+            room__id=self.kwargs.get('room_pk'),
+            room__home__id=self.kwargs.get('home_pk')
+        )
+
+    def get_list_version(self):
+        return get_room_home_version(self.kwargs.get('room_pk'))
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        room_pk = self.kwargs.get('room_pk')
+        # the list does not use the room, the other actions share the request's hierarchy
         if self.action != 'list':
-            context['room'] = get_object_or_404(Room, id=room_pk)
-        else:
-            context['room'] = Room.objects.filter(id=room_pk).first()
+            context['room'] = self.get_hierarchy().room
         return context
 
     def create(self, request, *args, **kwargs):
@@ -76,22 +131,19 @@ class DeviceViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         device = serializer.save()
         user = request.user
-        if user.is_authenticated and hasattr(user, 'points'):
-            user.points += 5
-            user.save()
-        # History of user's action
+        award_points(user, POINTS_DEVICE_CREATED, 'device_created')
+        # History of user's action (written by the audit subscriber)
         user = request.user if request.user.is_authenticated else None
         ip = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] or request.META.get('REMOTE_ADDR')
         user_agent = request.META.get('HTTP_USER_AGENT', '')
-        if user:
-            ActionHistory.objects.create(
-                user=user,
-                action_type="CREATE_DEVICE",
-                target_id=str(device.id),
-                target_repr=str(device),
-                ip_address=ip,
-                user_agent=user_agent
-            )
+        bus.publish(DeviceCreated(
+            home_id=str(device.room.home_id),
+            device_id=str(device.id),
+            user_id=str(user.id) if user else None,
+            target_repr=str(device),
+            ip_address=ip,
+            user_agent=user_agent
+        ))
         return ApiResponse.success(
             DeviceSerializer(device).data,
             message="Device created successfully",
@@ -101,9 +153,18 @@ class DeviceViewSet(viewsets.ModelViewSet):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        previous_state = dict(instance.state or {})
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         device = serializer.save()
+        changes = [
+            (device, capability, value)
+            for capability, value in (device.state or {}).items()
+            if previous_state.get(capability) != value
+        ]
+        if changes:
+            publish_state_change(device, {capability: value for _, capability, value in changes})
+            automation_engine.handle_changes(changes, user=request.user)
         return ApiResponse.success(
             DeviceSerializer(device).data,
             message="Device updated successfully"
@@ -118,21 +179,6 @@ class DeviceViewSet(viewsets.ModelViewSet):
         )
 
 
-#Local mapping of device type to power
-DEVICE_TYPE_POWER = {
-    "smart_bulb_x": 0.07,        # 70W
-    "smart_thermostat_x": 0.05,  # 50W
-    "smart_shutter_x": 0,        # no consumption
-    "smart_television_x": 0.1,   # 100W
-    "smart_oven_x": 1.8,         # 1800W
-    "smart_doorlocker_x": 0,     # no consumption
-    "smart_speaker_x": 0.02,     # 20W
-    "security_camera_x": 0.03,   # 30W
-    "smart_fridge_x": 0.25,      # 250W or 150W depending on the mode
-    "dish_washer": 2,            # 2000W
-    "washing_machine": 2.5,       # 2500W
-}
-
 class EnergyConsumptionView(APIView): #TODO?: Check logics & data
     def get(self, request):
         # La puissance sera déterminée pour chaque device dans la boucle plus bas
@@ -175,77 +221,7 @@ class EnergyConsumptionView(APIView): #TODO?: Check logics & data
 
         #calculate the consumption for each device
         for device in devices:
-            power_kw = DEVICE_TYPE_POWER.get(getattr(device, 'type', None), 0)
-            
-            device_state = getattr(device, 'state', {}) or {}
-            
-            if device.type == "smart_bulb_x":
-                brightness = device_state.get("brightness", 100)
-                if brightness is not None and isinstance(brightness, (int, float)):
-                    power_kw *= (brightness/100)
-                else:
-                    power_kw *= 1 
-            
-            if device.type == "smart_thermostat_x":
-                temperature = device_state.get("temperature", 100)
-                if temperature is not None and isinstance(temperature, (int, float)):
-                    distance = abs(temperature - 50)
-                    power_kw *= 0.2 + (distance / 50) * (1 - 0.2)
-                else:
-                    power_kw *= 1 
-
-            if device.type == "dish_washer":
-                temperature = device_state.get("temperature", 100)
-                cycle = device_state.get("cycle_selection", "Normal")
-                if cycle == "Normal":
-                    coef= 1
-                elif cycle == "Eco":
-                    coef= 0.9
-                elif cycle == "Quick":
-                    coef= 1.2
-                else:
-                    coef= 1
-                if temperature is not None and isinstance(temperature, (int, float)):
-                    power_kw *= coef*((50+temperature)/150)
-                else:
-                    power_kw *= coef 
-            
-            if device.type == "washing_machine":
-                temperature = device_state.get("temperature", 100)
-                spin_speed_control = device_state.get("spin_speed_control", 2000)
-                cycle = device_state.get("cycle_selection", "Normal")
-                if cycle == "Normal":
-                    coef= 1
-                elif cycle == "Eco":
-                    coef= 0.9
-                elif cycle == "Quick":
-                    coef= 1.2
-                else:
-                    coef= 1
-                if temperature is not None and isinstance(temperature, (int, float)):
-                    power_kw *= coef*((50+temperature)/150)*(spin_speed_control/2000)
-                else:
-                    power_kw *= coef 
-
-            if device.type == "smart_oven_x":
-                heat = device_state.get("heat", 0)
-                if heat is not None and isinstance(heat, (int, float)) and 50 <= heat <= 250:
-                    power_kw *= (heat/250)
-                else:
-                    power_kw = 0.0 
-
-            if device.type == "smart_fridge_x":
-                mode = device_state.get("mode", "normal")
-                on_off = device_state.get("on_off", True)
-                power = device_state.get("power", "on")
-                
-                if (on_off is not None and on_off) or (power is not None and power == "on"):
-                    if mode == "eco":
-                        power_kw = 0.15
-                    else:
-                        power_kw = 0.25
-                else:
-                    power_kw = 0.0
+            power_kw = running_power_kw(device.type, device.state)
 
             last_before = device.commands.filter(
                 capability='on_off',
@@ -397,11 +373,16 @@ class DeviceConsumptionHistoryView(APIView):
     def post(self, request):
         serializer = DeviceConsumptionHistorySerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        reading = serializer.save()
+        bus.publish(ConsumptionRecorded(
+            home_id=str(reading.device.room.home_id),
+            device_id=str(reading.device_id),
+            reading=dict(serializer.data),
+        ))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class DeviceCommandViewSet(viewsets.ModelViewSet):
+class DeviceCommandViewSet(HomeHierarchyMixin, viewsets.ModelViewSet):
     serializer_class = DeviceCommandSerializer
     permission_classes = [IsHomeOwnerOrMember]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -412,13 +393,16 @@ class DeviceCommandViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post']
 
     def get_queryset(self):
-        device_pk = self.kwargs.get('device_pk')
-        return DeviceCommand.objects.filter(device__id=device_pk)
+        return DeviceCommand.objects.filter(
+            device__id=self.kwargs.get('device_pk'),
+            device__room__id=self.kwargs.get('room_pk'),
+            device__room__home__id=self.kwargs.get('home_pk')
+        ).select_related('device__room', 'user')
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        device_pk = self.kwargs.get('device_pk')
-        context['device'] = get_object_or_404(Device, id=device_pk)
+        if self.action == 'create':
+            context['device'] = self.get_hierarchy().device
         return context
 
     def create(self, request, *args, **kwargs):
@@ -434,7 +418,9 @@ class DeviceCommandViewSet(viewsets.ModelViewSet):
         device = command.device
         capability = command.capability
         value = command.parameters.get(capability)
+        changed = False
         if capability in device.state:
+            changed = device.state[capability] != value
             device.state[capability] = value
             device.save()
         else:
@@ -445,8 +431,206 @@ class DeviceCommandViewSet(viewsets.ModelViewSet):
         command.response = {"result": "success", "applied": {capability: value}}
         command.save()
 
+        publish_commands([command])
+        if changed:
+            publish_state_change(device, {capability: value})
+            automation_engine.handle_changes([(device, capability, value)], user=request.user)
+
         return ApiResponse.success(
             DeviceCommandSerializer(command).data,
             message="Command sent and executed successfully",
             status_code=status.HTTP_201_CREATED
         )
+
+
+class AutomationRuleViewSet(HomeHierarchyMixin, viewsets.ModelViewSet):
+    serializer_class = AutomationRuleSerializer
+    permission_classes = [IsHomeOwnerOrMember]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_fields = ['is_active', 'trigger_device', 'trigger_capability']
+    search_fields = ['name']
+    ordering_fields = ['name', 'created_at']
+    ordering = ['name']
+
+    def get_queryset(self):
+        home_pk = self.kwargs.get('home_pk')
+        return AutomationRule.objects.filter(home__id=home_pk)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action != 'list':
+            context['home'] = self.get_hierarchy().home
+        return context
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rule = serializer.save()
+        return ApiResponse.success(
+            AutomationRuleSerializer(rule).data,
+            message="Automation rule created successfully",
+            status_code=status.HTTP_201_CREATED
+        )
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        rule = serializer.save()
+        return ApiResponse.success(
+            AutomationRuleSerializer(rule).data,
+            message="Automation rule updated successfully"
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        self.perform_destroy(instance)
+        return ApiResponse.success(
+            message="Automation rule deleted successfully",
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+
+
+class SceneViewSet(HomeHierarchyMixin, viewsets.ModelViewSet):
+    serializer_class = SceneSerializer
+    permission_classes = [IsHomeOwnerOrMember]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    search_fields = ['name']
+    ordering_fields = ['name', 'created_at']
+    ordering = ['name']
+
+    def get_queryset(self):
+        home_pk = self.kwargs.get('home_pk')
+        return Scene.objects.filter(home__id=home_pk)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action != 'list':
+            context['home'] = self.get_hierarchy().home
+        return context
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        scene = serializer.save()
+        return ApiResponse.success(
+            SceneSerializer(scene).data,
+            message="Scene created successfully",
+            status_code=status.HTTP_201_CREATED
+        )
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        scene = serializer.save()
+        return ApiResponse.success(
+            SceneSerializer(scene).data,
+            message="Scene updated successfully"
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        self.perform_destroy(instance)
+        return ApiResponse.success(
+            message="Scene deleted successfully",
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+
+    @action(detail=True, methods=['post'])
+    def activate(self, request, *args, **kwargs):
+        scene = self.get_object()
+        # devices removed since the scene was saved are skipped
+        devices = {
+            str(device.id): device
+            for device in Device.objects.filter(
+                id__in=list(scene.states.keys()), room__home_id=scene.home_id
+            ).select_related('room')
+        }
+        commands = execute_commands(scene.compiled_actions(devices), user=request.user)
+        failed = [command for command in commands if command.status == DeviceCommand.Status.FAILED]
+        return ApiResponse.success(
+            {
+                'scene': SceneSerializer(scene).data,
+                'devices': DeviceSerializer(devices.values(), many=True).data,
+                'commands_count': len(commands),
+                'failed_count': len(failed),
+            },
+            message="Scene activated successfully"
+        )
+
+
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _authenticate_stream(request, home_pk):
+    """
+    EventSource cannot send headers, so the access token may also be given
+    as a `token` query parameter. Returns (user, error_response).
+    """
+    authentication = CachedJWTAuthentication()
+    raw_token = request.GET.get('token')
+    if raw_token is None:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None, JsonResponse({"status": "error", "message": "Authentication credentials were not provided.", "errors": []}, status=401)
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user = authentication.get_user(token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        # AuthenticationFailed: inactive (ex: tombstoned) or deleted user; this view is outside DRF's exception handler
+        return None, JsonResponse({"status": "error", "message": "Invalid or expired token.", "errors": []}, status=401)
+    if not can_access_home(user, home_pk, token=token):
+        return None, JsonResponse({"status": "error", "message": "Access forbidden", "errors": []}, status=403)
+    return user, None
+
+
+def _sync_stream(home_pk):
+    subscriber = push.broker.subscribe(home_pk, asynchronous=False)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            message = subscriber.get(STREAM_KEEPALIVE_SECONDS)
+            yield ": keepalive\n\n" if message is None else push.format_sse(message)
+    finally:
+        # the WSGI server closes the generator once a write to the gone client fails
+        push.broker.unsubscribe(home_pk, subscriber)
+
+
+async def _async_stream(home_pk):
+    subscriber = push.broker.subscribe(home_pk)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            message = await subscriber.get(STREAM_KEEPALIVE_SECONDS)
+            yield ": keepalive\n\n" if message is None else push.format_sse(message)
+    finally:
+        push.broker.unsubscribe(home_pk, subscriber)
+
+
+async def home_event_stream(request, home_pk):
+    """
+    Server-Sent Events stream of a home: device_state, command, power,
+    consumption and member_added/member_removed events, replacing
+    client-side polling.
+
+    Django reads a streaming response with the iterator kind of its handler
+    (an async iterator under WSGI, or a sync one under ASGI, is read to the
+    end before anything is sent), so the stream follows the server: a
+    blocking generator on runserver/WSGI, an async one on an ASGI server.
+    """
+    user, error = await sync_to_async(_authenticate_stream)(request, home_pk)
+    if error is not None:
+        return error
+
+    if isinstance(request, ASGIRequest):
+        stream = _async_stream(home_pk)
+    else:
+        stream = _sync_stream(home_pk)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
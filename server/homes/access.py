@@ -0,0 +1,94 @@
+from .models import Home, HomeAccess
+
+#access table: keeps HomeAccess in step with Home.owner / Home.members (called from homes.signals)
+
+
+def add_member_access(home_ids, user_ids):
+    """Member rows for every (home, user) pair; existing rows, the owner's included, are left alone."""
+    HomeAccess.objects.bulk_create(
+        [
+            HomeAccess(home_id=home_id, user_id=user_id, role=HomeAccess.Role.MEMBER)
+            for home_id in home_ids for user_id in user_ids
+        ],
+        ignore_conflicts=True
+    )
+
+
+def remove_member_access(home_ids=None, user_ids=None):
+    accesses = HomeAccess.objects.filter(role=HomeAccess.Role.MEMBER)
+    if home_ids is not None:
+        accesses = accesses.filter(home_id__in=home_ids)
+    if user_ids is not None:
+        accesses = accesses.filter(user_id__in=user_ids)
+    accesses.delete()
+
+
+def sync_owner_access(home, created=False):
+    """
+    Give the owner row to home.owner and return the ids of the previous
+    owners: they keep a member row when they are still in home.members.
+    """
+    if created:
+        HomeAccess.objects.create(home_id=home.id, user_id=home.owner_id, role=HomeAccess.Role.OWNER)
+        return []
+    owner_ids = list(
+        HomeAccess.objects.filter(home_id=home.id, role=HomeAccess.Role.OWNER).values_list('user_id', flat=True)
+    )
+    if owner_ids == [home.owner_id]:
+        return []
+    previous = [user_id for user_id in owner_ids if user_id != home.owner_id]
+    if previous:
+        still_members = set(home.members.filter(id__in=previous).values_list('id', flat=True))
+        HomeAccess.objects.filter(home_id=home.id, user_id__in=still_members).update(role=HomeAccess.Role.MEMBER)
+        HomeAccess.objects.filter(home_id=home.id, user_id__in=set(previous) - still_members).delete()
+    HomeAccess.objects.update_or_create(
+        home_id=home.id, user_id=home.owner_id, defaults={'role': HomeAccess.Role.OWNER}
+    )
+    return previous
+
+
+def rebuild_home_access(batch_size=500):
+    """
+    Recompute the access rows from Home.owner / Home.members, batch_size
+    homes at a time (deleted homes have none). Returns the number of rows (created, updated, deleted).
+    """
+    created = updated = deleted = 0
+    Membership = Home.members.through
+    last_id = None
+    while True:
+        homes = Home.objects.filter(deleted_at__isnull=True).order_by('id')
+        if last_id is not None:
+            homes = homes.filter(id__gt=last_id)
+        batch = list(homes.values_list('id', 'owner_id')[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        home_ids = [home_id for home_id, _ in batch]
+
+        expected = {}
+        for user_id, home_id in Membership.objects.filter(home_id__in=home_ids).values_list('user_id', 'home_id'):
+            expected[(user_id, home_id)] = HomeAccess.Role.MEMBER
+        for home_id, owner_id in batch:
+            expected[(owner_id, home_id)] = HomeAccess.Role.OWNER
+
+        existing = {
+            (user_id, home_id): (access_id, role)
+            for access_id, user_id, home_id, role in HomeAccess.objects.filter(home_id__in=home_ids)
+            .values_list('id', 'user_id', 'home_id', 'role')
+        }
+        stale = [access_id for key, (access_id, _) in existing.items() if key not in expected]
+        changed = [
+            HomeAccess(id=existing[key][0], role=role)
+            for key, role in expected.items() if key in existing and existing[key][1] != role
+        ]
+        missing = [
+            HomeAccess(user_id=user_id, home_id=home_id, role=role)
+            for (user_id, home_id), role in expected.items() if (user_id, home_id) not in existing
+        ]
+        if stale:
+            deleted += HomeAccess.objects.filter(id__in=stale).delete()[0]
+        if changed:
+            updated += HomeAccess.objects.bulk_update(changed, ['role'])
+        if missing:
+            created += len(HomeAccess.objects.bulk_create(missing))
+    return created, updated, deleted
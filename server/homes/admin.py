@@ -1,9 +1,12 @@
 from django.contrib import admin
+from utils.admin import RecentRowsInline, related_count
 from .models import Home, HomeInvitation
 
-class HomeInvitationInline(admin.TabularInline):
+class HomeInvitationInline(RecentRowsInline):
     model = HomeInvitation
-    extra = 0
+    max_rows = 20
+    ordering = ('-created_at',)
+    list_select_related = ('home', 'inviter')
     fields = ('email', 'status', 'inviter', 'created_at', 'expires_at')
     readonly_fields = ('created_at', 'updated_at')
     show_change_link = True
@@ -14,9 +17,10 @@ class HomeInvitationInline(admin.TabularInline):
 @admin.register(Home)
 class HomeAdmin(admin.ModelAdmin):
     list_display = ('name', 'owner', 'color', 'created_at', 'updated_at', 'member_count')
-    list_filter = ('owner', 'color', 'created_at')
+    list_filter = ('color', 'created_at', ('deleted_at', admin.EmptyFieldListFilter))
+    list_select_related = ('owner',)
     search_fields = ('name', 'owner__email', 'owner__username')
-    filter_horizontal = ('members',)
+    raw_id_fields = ('owner', 'members')
     inlines = [HomeInvitationInline]
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('-created_at',)
@@ -29,14 +33,20 @@ class HomeAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(member_count=related_count(Home.members.through, 'home'))
+
     def member_count(self, obj):
-        return obj.members.count()
+        return obj.member_count
     member_count.short_description = 'Number of Members'
+    member_count.admin_order_field = 'member_count'
 
 @admin.register(HomeInvitation)
 class HomeInvitationAdmin(admin.ModelAdmin):
     list_display = ('email', 'home', 'inviter', 'status', 'created_at', 'expires_at')
     list_filter = ('status', 'created_at', 'expires_at')
+    list_select_related = ('home', 'inviter')
+    raw_id_fields = ('home', 'inviter')
     search_fields = ('email', 'home__name', 'inviter__email', 'inviter__username')
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('-created_at',)
\ No newline at end of file
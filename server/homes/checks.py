@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Error, register
+from .membership import uses_shared_cache
+
+
+@register()
+def check_home_access_claims(app_configs, **kwargs):
+    """
+    The `homes` token claims are trusted while the user's access version is
+    unchanged in the cache: with a per-process cache, a membership change
+    would only rotate the version of the worker that handled it.
+    """
+    if getattr(settings, 'HOME_ACCESS_CLAIMS', False) and not uses_shared_cache():
+        return [Error(
+            "HOME_ACCESS_CLAIMS requires a cache shared by all the processes.",
+            hint="Configure a Redis, Memcached or database cache as CACHES['default'], or set HOME_ACCESS_CLAIMS = False.",
+            id='homes.E001',
+        )]
+    return []
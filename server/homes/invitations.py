@@ -0,0 +1,27 @@
+from django.utils import timezone
+from .models import HomeInvitation
+
+#invitation expiry sweeper, run periodically by the expire_invitations command
+
+
+def expire_overdue_invitations(batch_size=1000, now=None):
+    """
+    Move the pending invitations past their expires_at to EXPIRED, with one
+    UPDATE per batch of ids (served by the (status, expires_at) index).
+    Returns the number of invitations expired.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        ids = list(
+            HomeInvitation.objects.filter(status=HomeInvitation.Status.PENDING, expires_at__lte=now)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return expired
+        # status is filtered again in case an invitation was accepted in between
+        expired += HomeInvitation.objects.filter(
+            id__in=ids, status=HomeInvitation.Status.PENDING
+        ).update(status=HomeInvitation.Status.EXPIRED, updated_at=now)
+        if len(ids) < batch_size:
+            return expired
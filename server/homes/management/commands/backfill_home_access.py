@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from homes.access import rebuild_home_access
+
+
+class Command(BaseCommand):
+    help = "Rebuild the HomeAccess rows from the owners and members of every home."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        created, updated, deleted = rebuild_home_access(batch_size=options['batch_size'])
+        self.stdout.write(f"{created} access rows created, {updated} updated, {deleted} deleted")
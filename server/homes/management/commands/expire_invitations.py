@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from homes.invitations import expire_overdue_invitations
+
+
+class Command(BaseCommand):
+    help = "Expire the pending invitations past their expiry date (run periodically, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        expired = expire_overdue_invitations(batch_size=options['batch_size'])
+        self.stdout.write(f"{expired} invitations expired")
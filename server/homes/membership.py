@@ -0,0 +1,104 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+#membership resolver: "can user U access home H, and as owner or member?" answered by one HomeAccess lookup and cached per user
+#the role cache and the token claims are only used with a cache shared by all the processes, since an
+#invalidation must reach every worker (see checks.check_home_access_claims)
+
+OWNER = 'owner'
+MEMBER = 'member'
+NO_ACCESS = ''
+
+# compact role codes of the `homes` access token claim
+CLAIM_CODES = {OWNER: 'o', MEMBER: 'm'}
+CLAIM_ROLES = {code: role for role, code in CLAIM_CODES.items()}
+
+
+def _cache_key(user_id, home_id):
+    return f"home_access:{user_id}:{home_id}"
+
+
+def _version_key(user_id):
+    return f"home_access_version:{user_id}"
+
+
+def uses_shared_cache():
+    """False for the per-process backends, where another worker would never see an invalidation."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def access_claims_enabled():
+    return getattr(settings, 'HOME_ACCESS_CLAIMS', False) and uses_shared_cache()
+
+
+def get_access_version(user_id):
+    """
+    Per-user version of the home access, changed on every membership change.
+    A random value is used so that a cache flush also invalidates the
+    claims of the tokens issued before it.
+    """
+    key = _version_key(user_id)
+    cache.add(key, uuid.uuid4().hex[:12], timeout=None)
+    return cache.get(key)
+
+
+def home_access_claims(user_id):
+    """Claims embedded in the access tokens: {home_id: 'o' | 'm'} and the access version."""
+    from .models import HomeAccess
+    version = get_access_version(user_id)
+    accesses = HomeAccess.objects.filter(user_id=user_id).values_list('home_id', 'role')
+    return {
+        'homes': {str(home_id): CLAIM_CODES[role] for home_id, role in accesses},
+        'hav': version,
+    }
+
+
+def _role_from_token(token, user, home_id):
+    """Role carried by the access token, or None when the claim is missing or stale."""
+    if token is None or not access_claims_enabled():
+        return None
+    try:
+        claims = token.get('homes')
+        version = token.get('hav')
+    except AttributeError:
+        return None
+    if claims is None or version is None or version != cache.get(_version_key(user.pk)):
+        return None
+    return CLAIM_ROLES.get(claims.get(str(home_id)), NO_ACCESS)
+
+
+def resolve_home_role(user, home_id, token=None):
+    """Return OWNER, MEMBER or None for the user on the home."""
+    if user is None or not user.is_authenticated or not home_id:
+        return None
+    role = _role_from_token(token, user, home_id)
+    if role is not None:
+        return role or None
+    shared = uses_shared_cache()
+    key = _cache_key(user.pk, home_id)
+    role = cache.get(key) if shared else None
+    if role is None:
+        from .models import HomeAccess
+        role = (
+            HomeAccess.objects.filter(user=user, home_id=home_id)
+            .values_list('role', flat=True)
+            .first()
+        ) or NO_ACCESS
+        if shared:
+            cache.set(key, role, getattr(settings, 'HOME_ACCESS_CACHE_TTL', 300))
+    return role or None
+
+
+def can_access_home(user, home_id, token=None):
+    return resolve_home_role(user, home_id, token=token) is not None
+
+
+def invalidate_home_access(home_id, user_ids):
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if user_ids:
+        cache.delete_many([_cache_key(user_id, home_id) for user_id in user_ids])
+        # tokens issued before this change fall back to the DB check
+        cache.set_many({_version_key(user_id): uuid.uuid4().hex[:12] for user_id in user_ids}, timeout=None)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='home',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 04:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homes', '0002_home_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='homeinvitation',
+            index=models.Index(fields=['status', 'expires_at'], name='homes_homei_status_5a5655_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 04:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_home_access(apps, schema_editor):
+    Home = apps.get_model('homes', 'Home')
+    HomeAccess = apps.get_model('homes', 'HomeAccess')
+    rows = {
+        (home_id, user_id): 'member'
+        for home_id, user_id in Home.members.through.objects.values_list('home_id', 'user_id')
+    }
+    for home_id, owner_id in Home.objects.values_list('id', 'owner_id'):
+        rows[(home_id, owner_id)] = 'owner'
+    HomeAccess.objects.bulk_create(
+        [HomeAccess(home_id=home_id, user_id=user_id, role=role) for (home_id, user_id), role in rows.items()],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homes', '0003_homeinvitation_status_expires_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('member', 'Member')], max_length=10)),
+                ('home', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accesses', to='homes.home')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='home_accesses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Home Access',
+                'verbose_name_plural': 'Home Accesses',
+                'unique_together': {('user', 'home')},
+            },
+        ),
+        migrations.RunPython(fill_home_access, migrations.RunPython.noop),
+    ]
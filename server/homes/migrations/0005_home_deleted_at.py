@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homes', '0004_homeaccess'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='home',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -17,6 +17,10 @@ class Home(models.Model):
         related_name='member_homes',
         blank=True
     )
+    # change counter of the home and everything inside it, used for the list ETags
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # tombstone: set by DELETE /homes/<id>/, the row itself is removed by the background purger
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -66,3 +70,38 @@ class HomeInvitation(models.Model):
         verbose_name_plural = 'Home Invitations'
         ordering = ['-created_at']
         unique_together = ('home', 'email')
+        # pending lists and the expiry sweeper (see invitations.expire_overdue_invitations)
+        indexes = [models.Index(fields=['status', 'expires_at'])]
+
+
+class HomeAccess(models.Model):
+    """
+    One row per (user, home) the user can see, with the role it gives.
+    Denormalized from Home.owner and Home.members and kept in sync by
+    homes.signals, so "homes of a user" is an indexed lookup instead of
+    an OR over the members join.
+    """
+
+    class Role(models.TextChoices):
+        OWNER = 'owner', 'Owner'
+        MEMBER = 'member', 'Member'
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='home_accesses'
+    )
+    home = models.ForeignKey(
+        Home,
+        on_delete=models.CASCADE,
+        related_name='accesses'
+    )
+    role = models.CharField(max_length=10, choices=Role.choices)
+
+    def __str__(self):
+        return f"{self.user_id} {self.role} of {self.home_id}"
+
+    class Meta:
+        verbose_name = 'Home Access'
+        verbose_name_plural = 'Home Accesses'
+        unique_together = ('user', 'home')
@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Home, HomeInvitation
+from rooms.serializers import RoomSerializer
+from devices.serializers import DeviceSerializer
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
 from datetime import timedelta
 
@@ -39,11 +43,14 @@ class HomeSerializer(HomeSerializerMixin, serializers.ModelSerializer):
     def get_owner_name(self, obj):
         return f"{obj.owner.first_name} {obj.owner.last_name}"
     
+    # the list querysets annotate the counts, single objects fall back to a query
     def get_rooms_count(self, obj):
-        return obj.rooms.count()
+        count = getattr(obj, 'rooms_count', None)
+        return obj.rooms.count() if count is None else count
     
     def get_members_count(self, obj):
-        return obj.members.count()
+        count = getattr(obj, 'members_count', None)
+        return obj.members.count() if count is None else count
     
     def create(self, validated_data):
         user = self.context['request'].user
@@ -58,35 +65,57 @@ class HomeDetailSerializer(HomeSerializer):
     class Meta(HomeSerializer.Meta):
         fields = HomeSerializer.Meta.fields + ['members', 'owner_id', 'permissions']
     
+    def _members(self, obj):
+        # the viewset prefetches the members, a lone instance loads them once here
+        prefetch_related_objects([obj], 'members')
+        return [member for member in obj.members.all() if member.id != obj.owner_id]
+    
     def get_permissions(self, obj):
         user = self.context['request'].user
+        is_owner = obj.owner_id == user.id
         return {
-            "can_update": obj.owner == user,
-            "can_delete": obj.owner == user,
-            "can_invite": obj.owner == user or user in obj.members.all(),
+            "can_update": is_owner,
+            "can_delete": is_owner,
+            "can_invite": is_owner or any(member.id == user.id for member in self._members(obj)),
         }
     
     def get_members(self, obj):
-        members_data = []
-        owner = obj.owner
-        members_data.append({
-            'id': owner.id,
-            'email': owner.email,
-            'username': getattr(owner, 'username', None),
-            'name': f"{owner.first_name} {owner.last_name}",
-            'avatar_url': getattr(owner, 'avatar_url', None),
-            'is_owner': True,
-        })
-        for member in obj.members.exclude(id=owner.id):
-            members_data.append({
-                'id': member.id,
-                'email': member.email,
-                'username': getattr(member, 'username', None),
-                'name': f"{member.first_name} {member.last_name}",
-                'avatar_url': getattr(member, 'avatar_url', None),
-                'is_owner': False,
-            })
+        members = self._members(obj)
+        if self.context.get('compact_members'):
+            return [obj.owner_id] + [member.id for member in members]
+        members_data = [self._member_data(obj.owner, is_owner=True)]
+        for member in members:
+            members_data.append(self._member_data(member, is_owner=False))
         return members_data
+    
+    def _member_data(self, user, is_owner):
+        return {
+            'id': user.id,
+            'email': user.email,
+            'username': getattr(user, 'username', None),
+            'name': f"{user.first_name} {user.last_name}",
+            'avatar_url': getattr(user, 'avatar_url', None),
+            'is_owner': is_owner,
+        }
+
+
+class SnapshotRoomSerializer(RoomSerializer):
+    devices = DeviceSerializer(many=True, read_only=True)
+
+    class Meta(RoomSerializer.Meta):
+        fields = RoomSerializer.Meta.fields + ['devices']
+
+
+class HomeSnapshotSerializer(HomeDetailSerializer):
+    """
+    The whole tree of a home (members, rooms, devices with state and
+    power) for the dashboard bootstrap. Nothing in it depends on the
+    requesting user, so one cached copy serves every member.
+    """
+    rooms = SnapshotRoomSerializer(many=True, read_only=True)
+
+    class Meta(HomeSerializer.Meta):
+        fields = HomeSerializer.Meta.fields + ['version', 'members', 'rooms']
 
 
 class HomeInvitationSerializer(serializers.ModelSerializer):
@@ -142,11 +171,20 @@ class HomeInvitationSerializer(serializers.ModelSerializer):
         validated_data['home'] = home
         validated_data['status'] = HomeInvitation.Status.PENDING
         validated_data['expires_at'] = timezone.now() + timedelta(days=7)
-        invitation = super().create(validated_data)
-        context = {
-            'home_id': str(home.id),
-            'email': invitation.email,
-            'role': getattr(invitation, 'role', 'MEMBER'),
-        }
-        send_email(user, 'invitation', context=context)
-        return invitation
\ No newline at end of file
+        with transaction.atomic():
+            invitation = super().create(validated_data)
+            context = {
+                'home_id': str(home.id),
+                'email': invitation.email,
+                'role': getattr(invitation, 'role', 'MEMBER'),
+            }
+            send_email(user, 'invitation', context=context)
+        return invitation
+
+
+class HomeInvitationBulkSerializer(serializers.Serializer):
+    emails = serializers.ListField(child=serializers.EmailField(), allow_empty=False, max_length=100)
+
+    def validate_emails(self, value):
+        # duplicates are invited once, in the order given
+        return list(dict.fromkeys(email.strip() for email in value))
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.dispatch import receiver
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from .versioning import bump_home_version, bump_room_home_version, bump_user_homes_version
+from .membership import invalidate_home_access
+
+
+def _is_cascade(instance, origin):
+    # rows deleted along with their room or home: the parent delete handles the bump
+    return origin is not None and origin is not instance and hasattr(origin, '_meta')
+
+
+@receiver(post_save, sender='homes.Home')
+def home_saved(sender, instance, created, update_fields=None, **kwargs):
+    from .access import sync_owner_access
+    previous_owners = []
+    if update_fields is None or 'owner' in update_fields:
+        previous_owners = sync_owner_access(instance, created=created)
+    invalidate_home_access(instance.id, [instance.owner_id, *previous_owners])
+    if not created:
+        bump_home_version(instance.id)
+
+
+@receiver(pre_delete, sender='homes.Home')
+def home_deleting(sender, instance, **kwargs):
+    # the member rows are gone by post_delete, so the cached access is dropped here
+    member_ids = list(instance.members.values_list('id', flat=True))
+    invalidate_home_access(instance.id, [instance.owner_id, *member_ids])
+
+
+# the user fields shown in the member lists of the homes (HomeDetailSerializer._member_data)
+MEMBER_PROFILE_FIELDS = {'email', 'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # a login only saves last_login: no need to drop the snapshots and ETags of every home
+    if created or (update_fields is not None and not MEMBER_PROFILE_FIELDS.intersection(update_fields)):
+        return
+    bump_user_homes_version(instance.pk)
+
+
+@receiver(m2m_changed, sender='homes.Home_members')
+def home_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    from .access import add_member_access, remove_member_access
+    if reverse:
+        # user.member_homes.add(...): instance is the user, pk_set the homes
+        if action == 'post_add':
+            add_member_access(pk_set or (), [instance.pk])
+        elif action == 'post_remove':
+            remove_member_access(pk_set or (), [instance.pk])
+        elif action == 'post_clear':
+            remove_member_access(user_ids=[instance.pk])
+        if action in ('post_add', 'post_remove'):
+            for home_id in pk_set or ():
+                invalidate_home_access(home_id, [instance.pk])
+                bump_home_version(home_id)
+        elif action == 'pre_clear':
+            for home_id in instance.member_homes.values_list('id', flat=True):
+                invalidate_home_access(home_id, [instance.pk])
+                bump_home_version(home_id)
+        return
+    if action == 'post_add':
+        add_member_access([instance.id], pk_set or ())
+    elif action == 'post_remove':
+        remove_member_access([instance.id], pk_set or ())
+    elif action == 'post_clear':
+        remove_member_access(home_ids=[instance.id])
+    if action in ('post_add', 'post_remove'):
+        invalidate_home_access(instance.id, pk_set or ())
+        bump_home_version(instance.id)
+    elif action == 'pre_clear':
+        invalidate_home_access(instance.id, instance.members.values_list('id', flat=True))
+    elif action == 'post_clear':
+        bump_home_version(instance.id)
+
+
+@receiver(post_save, sender='rooms.Room')
+def room_saved(sender, instance, **kwargs):
+    bump_home_version(instance.home_id)
+
+
+@receiver(post_delete, sender='rooms.Room')
+def room_deleted(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        bump_home_version(instance.home_id)
+
+
+@receiver(post_save, sender='devices.Device')
+def device_saved(sender, instance, **kwargs):
+    bump_room_home_version(instance.room_id)
+
+
+@receiver(post_delete, sender='devices.Device')
+def device_deleted(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        bump_room_home_version(instance.room_id)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.cache import cache
+from .versioning import get_home_version
+
+#home snapshot: home, members, rooms and devices in one payload, cached per home version
+
+
+def _cache_key(home_id, version):
+    return f"home_snapshot:{home_id}:{version}"
+
+
+def load_home_tree(home_id):
+    """The home with its owner, members, rooms and devices, in four queries."""
+    from .models import Home
+    return (
+        Home.objects.select_related('owner')
+        .prefetch_related('members', 'rooms__devices')
+        .filter(id=home_id)
+        .first()
+    )
+
+
+def get_home_snapshot(home_id):
+    """
+    Serialized snapshot of the home, or None when it does not exist.
+    Every write to the home bumps Home.version, so a new version is a new
+    key and stale entries simply expire.
+    """
+    from .serializers import HomeSnapshotSerializer
+    version = get_home_version(home_id)
+    if version is None:
+        return None
+    snapshot = cache.get(_cache_key(home_id, version))
+    if snapshot is None:
+        home = load_home_tree(home_id)
+        if home is None:
+            return None
+        snapshot = HomeSnapshotSerializer(home).data
+        cache.set(
+            _cache_key(home_id, home.version), snapshot,
+            getattr(settings, 'HOME_SNAPSHOT_CACHE_TTL', 300)
+        )
+    return snapshot
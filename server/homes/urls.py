@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import HomeViewSet, HomeInvitationViewSet
-from devices.views import HomeDeviceListView, DeviceViewSet, DeviceCommandViewSet
+from devices.views import HomeDeviceListView, PowerSummaryView, DeviceViewSet, DeviceCommandViewSet, AutomationRuleViewSet, SceneViewSet, home_event_stream
 from rooms.views import RoomViewSet
 
 app_name = 'homes'
@@ -10,6 +10,10 @@ urlpatterns = [
          HomeViewSet.as_view({'get': 'list', 'post': 'create'}), 
          name='home-list'),
     
+    path('me/',
+         HomeViewSet.as_view({'get': 'me'}),
+         name='home-me'),
+    
     path('<uuid:pk>/', 
          HomeViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}),
          name='home-detail'),
@@ -18,6 +22,10 @@ urlpatterns = [
          HomeViewSet.as_view({'post': 'set_primary'}),
          name='home-set-primary'),
     
+    path('<uuid:pk>/snapshot/',
+         HomeViewSet.as_view({'get': 'snapshot'}),
+         name='home-snapshot'),
+    
     path('<uuid:pk>/add_member/', 
          HomeViewSet.as_view({'post': 'add_member'}),
          name='home-add-member'),
@@ -30,6 +38,14 @@ urlpatterns = [
          HomeDeviceListView.as_view(),
          name='home-device-list'),
 
+    path('<uuid:home_pk>/power/',
+         PowerSummaryView.as_view(),
+         name='home-power-summary'),
+
+    path('<uuid:home_pk>/events/',
+         home_event_stream,
+         name='home-event-stream'),
+
     path('<uuid:home_pk>/rooms/',
          RoomViewSet.as_view({'get': 'list', 'post': 'create'}),
          name='room-list'),
@@ -37,6 +53,9 @@ urlpatterns = [
          RoomViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}),
          name='room-detail'),
 
+    path('<uuid:home_pk>/rooms/<uuid:room_pk>/power/',
+         PowerSummaryView.as_view(),
+         name='room-power-summary'),
     path('<uuid:home_pk>/rooms/<uuid:room_pk>/devices/',
          DeviceViewSet.as_view({'get': 'list', 'post': 'create'}),
          name='room-device-list'),
@@ -51,10 +70,31 @@ urlpatterns = [
          DeviceCommandViewSet.as_view({'get': 'retrieve'}),
          name='device-commands-detail'),
 
+    path('<uuid:home_pk>/automations/',
+         AutomationRuleViewSet.as_view({'get': 'list', 'post': 'create'}),
+         name='automation-rule-list'),
+    path('<uuid:home_pk>/automations/<uuid:pk>/',
+         AutomationRuleViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}),
+         name='automation-rule-detail'),
+
+    path('<uuid:home_pk>/scenes/',
+         SceneViewSet.as_view({'get': 'list', 'post': 'create'}),
+         name='scene-list'),
+    path('<uuid:home_pk>/scenes/<uuid:pk>/',
+         SceneViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}),
+         name='scene-detail'),
+    path('<uuid:home_pk>/scenes/<uuid:pk>/activate/',
+         SceneViewSet.as_view({'post': 'activate'}),
+         name='scene-activate'),
+
     path('<uuid:home_pk>/invitations/', 
          HomeInvitationViewSet.as_view({'get': 'list', 'post': 'create'}),
          name='home-invitations-list'),
     
+    path('<uuid:home_pk>/invitations/bulk/',
+         HomeInvitationViewSet.as_view({'post': 'bulk'}),
+         name='home-invitations-bulk'),
+    
     path('<uuid:home_pk>/invitations/<uuid:pk>/', 
          HomeInvitationViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'}),
          name='home-invitation-detail'),
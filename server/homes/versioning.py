@@ -0,0 +1,31 @@
+from django.db.models import F
+
+#per-home change counter: bumped on every write to the home, its members, rooms or devices
+
+
+def bump_home_version(*home_ids):
+    from .models import Home
+    home_ids = {home_id for home_id in home_ids if home_id}
+    if home_ids:
+        Home.objects.filter(id__in=home_ids).update(version=F('version') + 1)
+
+
+def bump_room_home_version(room_id):
+    from .models import Home
+    Home.objects.filter(rooms__id=room_id).update(version=F('version') + 1)
+
+
+def bump_user_homes_version(user_id):
+    """Bump every home the user owns or belongs to, their member lists show the user's profile."""
+    from .models import Home
+    Home.objects.filter(accesses__user_id=user_id).update(version=F('version') + 1)
+
+
+def get_home_version(home_id):
+    from .models import Home
+    return Home.objects.filter(id=home_id).values_list('version', flat=True).first()
+
+
+def get_room_home_version(room_id):
+    from .models import Home
+    return Home.objects.filter(rooms__id=room_id).values_list('version', flat=True).first()
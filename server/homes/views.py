@@ -3,14 +3,24 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from utils.tokens import TokenGenerator
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Prefetch
 from django.utils import timezone
-from .models import Home, HomeInvitation
-from .serializers import HomeSerializer, HomeDetailSerializer, HomeInvitationSerializer
+from datetime import timedelta
+from .models import Home, HomeAccess, HomeInvitation
+from .serializers import HomeSerializer, HomeDetailSerializer, HomeInvitationSerializer, HomeInvitationBulkSerializer
 from utils.responses import ApiResponse
+from users.points import award_points, POINTS_HOME_CREATED
+from users.purge import tombstone_home
+from users.serializers import DeletionJobSerializer
 from utils.permissions import IsOwner, IsHomeOwnerOrMember
-from utils.exceptions import PermissionDeniedError
+from utils.conditional import ConditionalListMixin
+from utils.hierarchy import HomeHierarchyMixin
+from .membership import can_access_home, resolve_home_role, OWNER
+from .snapshot import get_home_snapshot
+from utils.exceptions import PermissionDeniedError, ResourceNotFoundError
+from utils.emails import send_emails
+from utils.events import bus, MemberAdded, MemberRemoved
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.contrib.auth import get_user_model
@@ -18,7 +28,14 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class HomeViewSet(viewsets.ModelViewSet):
+def annotate_home_counts(queryset):
+    return queryset.annotate(
+        rooms_count=Count('rooms', distinct=True),
+        members_count=Count('members', distinct=True)
+    )
+
+
+class HomeViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = HomeSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['owner']
@@ -28,17 +45,44 @@ class HomeViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        return Home.objects.filter(
-            Q(owner=user) | Q(members=user)
-        ).distinct()
+        if not user.is_authenticated:
+            return Home.objects.none()
+        # one HomeAccess row per (user, home): no OR over the members join, no DISTINCT
+        queryset = annotate_home_counts(Home.objects.select_related('owner')).filter(accesses__user=user)
+        if self.action in ['retrieve', 'me', 'add_member', 'remove_member']:
+            if self.compact_members():
+                queryset = queryset.prefetch_related(Prefetch('members', queryset=User.objects.only('id')))
+            else:
+                queryset = queryset.prefetch_related('members')
+        return queryset
+    
+    def compact_members(self):
+        # ?members=ids returns the member ids only, for large households
+        return self.request.query_params.get('members') == 'ids'
+    
+    def get_list_version(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return None
+        versions = (
+            HomeAccess.objects.filter(user=user)
+            .order_by('home_id')
+            .values_list('home_id', 'home__version')
+        )
+        return ','.join(f"{home_id}:{version}" for home_id, version in versions)
     
     def get_serializer_class(self):
         if self.action in ['retrieve', 'me']:
             return HomeDetailSerializer
         return HomeSerializer
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['compact_members'] = self.compact_members()
+        return context
+    
     def get_permissions(self):
-        if self.action == 'create':
+        if self.action in ['create', 'me']:
             return [permissions.IsAuthenticated()]
         elif self.action in ['update', 'partial_update', 'destroy']:
             return [IsOwner()]
@@ -50,9 +94,7 @@ class HomeViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         home = serializer.save()
         user = request.user
-        if user.is_authenticated and hasattr(user, 'points'):
-            user.points += 30
-            user.save()
+        award_points(user, POINTS_HOME_CREATED, 'home_created')
         return ApiResponse.success(
             HomeSerializer(home).data,
             message="Home created successfully",
@@ -72,19 +114,38 @@ class HomeViewSet(viewsets.ModelViewSet):
     
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        self.perform_destroy(instance)
+        # hidden right away, the rooms, devices and their history are purged in the background
+        job = tombstone_home(instance, requested_by=request.user)
         return ApiResponse.success(
-            message="Home deleted successfully",
-            status_code=status.HTTP_204_NO_CONTENT
+            DeletionJobSerializer(job).data,
+            message="Home deletion scheduled",
+            status_code=status.HTTP_202_ACCEPTED
         )
     
     @action(detail=False, methods=['get'])
     def me(self, request):
-        user = request.user
-        homes = Home.objects.filter(owner=user)
+        # the homes owned by the user, through get_queryset(): tombstoned homes have no access row left
+        homes = self.filter_queryset(self.get_queryset()).filter(owner=request.user)
         serializer = self.get_serializer(homes, many=True)
         return ApiResponse.success(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def snapshot(self, request, pk=None):
+        role = resolve_home_role(request.user, pk, token=request.auth)
+        snapshot = get_home_snapshot(pk) if role else None
+        if snapshot is None:
+            raise ResourceNotFoundError("Home not found.")
+        is_owner = role == OWNER
+        # the cached part is shared by all members, the permissions are added per request
+        return ApiResponse.success({
+            **snapshot,
+            'permissions': {
+                "can_update": is_owner,
+                "can_delete": is_owner,
+                "can_invite": True,
+            },
+        })
+    
     @action(detail=True, methods=['post'])
     def add_member(self, request, pk=None):
         home = self.get_object()
@@ -110,9 +171,12 @@ class HomeViewSet(viewsets.ModelViewSet):
         
         home.members.add(user)
         home.save()
+        bus.publish(MemberAdded(home_id=str(home.id), user_id=str(user.id)))
         
+        # reloaded so that the counts and the prefetched members include the change
+        home = self.get_queryset().get(pk=home.pk)
         return ApiResponse.success(
-            HomeDetailSerializer(home).data,
+            HomeDetailSerializer(home, context=self.get_serializer_context()).data,
             message="Member added successfully"
         )
     
@@ -140,9 +204,11 @@ class HomeViewSet(viewsets.ModelViewSet):
             return ApiResponse.error("User is not a member of this home.")
         
         home.members.remove(user)
+        bus.publish(MemberRemoved(home_id=str(home.id), user_id=str(user.id)))
         
+        home = self.get_queryset().get(pk=home.pk)
         try:
-            serialized_data = HomeDetailSerializer(home).data
+            serialized_data = HomeDetailSerializer(home, context=self.get_serializer_context()).data
             return ApiResponse.success(
                 serialized_data,
                 message="Member removed successfully"
@@ -151,7 +217,7 @@ class HomeViewSet(viewsets.ModelViewSet):
             from rest_framework.response import Response
             return Response({"message": "Member removed successfully"}, status=status.HTTP_200_OK)
 
-class HomeInvitationViewSet(viewsets.ModelViewSet):
+class HomeInvitationViewSet(HomeHierarchyMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='accept-by-token', permission_classes=[IsAuthenticated])
     def accept_by_token(self, request):
@@ -185,6 +251,7 @@ class HomeInvitationViewSet(viewsets.ModelViewSet):
         home.members.add(request.user)
         invitation.status = HomeInvitation.Status.ACCEPTED
         invitation.save()
+        bus.publish(MemberAdded(home_id=str(home.id), user_id=str(request.user.id)))
         return ApiResponse.success(message="Invitation accepted successfully")
 
     @action(detail=False, methods=['post'], url_path='reject-by-token', permission_classes=[IsAuthenticated])
@@ -223,14 +290,16 @@ class HomeInvitationViewSet(viewsets.ModelViewSet):
     serializer_class = HomeInvitationSerializer
     
     def get_queryset(self):
-        home_id = self.kwargs['home_pk']
-        home = get_object_or_404(Home, id=home_id)
+        home = self.get_hierarchy().home
         
         user = self.request.user
-        if user != home.owner and user not in home.members.all():
+        if not can_access_home(user, home.id, token=self.request.auth):
             return HomeInvitation.objects.none()
         
-        return HomeInvitation.objects.filter(home=home, status=HomeInvitation.Status.PENDING)
+        # overdue rows the sweeper has not expired yet are left out here
+        return HomeInvitation.objects.filter(
+            home=home, status=HomeInvitation.Status.PENDING, expires_at__gt=timezone.now()
+        ).select_related('home', 'inviter')
     
     def get_permissions(self):
         if self.action in ['create', 'destroy']:
@@ -240,13 +309,12 @@ class HomeInvitationViewSet(viewsets.ModelViewSet):
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        home_id = self.kwargs.get('home_pk') or self.kwargs.get('pk')
-        context['home'] = get_object_or_404(Home, id=home_id)
+        if self.kwargs.get('home_pk'):
+            context['home'] = self.get_hierarchy().home
         return context
     
     def create(self, request, *args, **kwargs):
-        home_id = self.kwargs['home_pk']
-        home = get_object_or_404(Home, id=home_id)
+        home = self.get_hierarchy().home
         
         if request.user != home.owner:
             raise PermissionDeniedError("Only the home owner can create invitations.")
@@ -254,10 +322,14 @@ class HomeInvitationViewSet(viewsets.ModelViewSet):
         email = request.data.get('email')
         if not email:
             return ApiResponse.error("Email is required.", status_code=400)
-        existing = HomeInvitation.objects.filter(home=home, email=email).exclude(status=HomeInvitation.Status.PENDING)
+        now = timezone.now()
+        # processed or overdue invitations are replaced by the new one
+        existing = HomeInvitation.objects.filter(home=home, email=email).exclude(
+            status=HomeInvitation.Status.PENDING, expires_at__gt=now
+        )
         if existing.exists():
             existing.delete()
-        if HomeInvitation.objects.filter(home=home, email=email, status=HomeInvitation.Status.PENDING).exists():
+        if HomeInvitation.objects.filter(home=home, email=email, status=HomeInvitation.Status.PENDING, expires_at__gt=now).exists():
             return ApiResponse.error("An invitation is already pending for this user.", status_code=400)
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -268,6 +340,72 @@ class HomeInvitationViewSet(viewsets.ModelViewSet):
             status_code=status.HTTP_201_CREATED
         )
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Invite a list of emails at once: one query for the existing
+        invitations, one for the members, one bulk insert and one batch
+        of emails. Owners, members and active invitations are skipped.
+        """
+        home = self.get_hierarchy().home
+        
+        if request.user != home.owner:
+            raise PermissionDeniedError("Only the home owner can create invitations.")
+        
+        serializer = HomeInvitationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        emails = serializer.validated_data['emails']
+        
+        now = timezone.now()
+        existing = {
+            invitation.email: invitation
+            for invitation in HomeInvitation.objects.filter(home=home, email__in=emails)
+        }
+        member_emails = set(home.members.filter(email__in=emails).values_list('email', flat=True))
+        skipped = []
+        replaced = []
+        to_invite = []
+        for email in emails:
+            invitation = existing.get(email)
+            if email == home.owner.email:
+                skipped.append({'email': email, 'reason': 'owner'})
+            elif email in member_emails:
+                skipped.append({'email': email, 'reason': 'member'})
+            elif invitation and invitation.status == HomeInvitation.Status.PENDING and invitation.expires_at > now:
+                skipped.append({'email': email, 'reason': 'pending'})
+            else:
+                # processed or overdue invitations are replaced, as in create()
+                if invitation:
+                    replaced.append(invitation.id)
+                to_invite.append(email)
+        
+        with transaction.atomic():
+            if replaced:
+                HomeInvitation.objects.filter(id__in=replaced).delete()
+            invitations = HomeInvitation.objects.bulk_create([
+                HomeInvitation(
+                    home=home,
+                    inviter=request.user,
+                    email=email,
+                    status=HomeInvitation.Status.PENDING,
+                    expires_at=now + timedelta(days=7)
+                )
+                for email in to_invite
+            ])
+            send_emails(request.user, 'invitation', [
+                {'home_id': str(home.id), 'email': email, 'role': 'MEMBER'}
+                for email in to_invite
+            ])
+        
+        return ApiResponse.success(
+            {
+                'invited': HomeInvitationSerializer(invitations, many=True).data,
+                'skipped': skipped,
+            },
+            message=f"{len(invitations)} invitations sent successfully",
+            status_code=status.HTTP_201_CREATED
+        )
+    
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         if request.user != instance.home.owner:
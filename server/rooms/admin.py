@@ -5,7 +5,9 @@ from .models import Room
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
     list_display = ('name', 'home', 'created_at', 'updated_at')
-    list_filter = ('home', 'created_at')
+    list_filter = ('created_at',)
+    list_select_related = ('home',)
+    raw_id_fields = ('home',)
     search_fields = ('name', 'home__name')
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('home', 'name')
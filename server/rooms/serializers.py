@@ -23,6 +23,10 @@ class RoomSerializer(serializers.ModelSerializer):
         return value
 
     def get_devices_count(self, obj):
+        # annotated by RoomViewSet, counted here for single objects
+        count = getattr(obj, 'devices_count', None)
+        if count is not None:
+            return count
         return obj.devices.count() if hasattr(obj, 'devices') else 0
 
     def create(self, validated_data):
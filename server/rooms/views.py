@@ -1,28 +1,35 @@
 from rest_framework import viewsets, status
-from django.shortcuts import get_object_or_404
+from django.db.models import Count
 from .models import Room
-from homes.models import Home
 from .serializers import RoomSerializer, RoomDetailSerializer
 from utils.responses import ApiResponse
+from users.points import award_points, POINTS_ROOM_CREATED
 from utils.permissions import IsHomeOwnerOrMember
+from utils.conditional import ConditionalListMixin
+from utils.hierarchy import HomeHierarchyMixin
+from homes.versioning import get_home_version
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from users.models_action_history import ActionHistory
+from utils.events import bus, RoomCreated
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(HomeHierarchyMixin, ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = RoomSerializer
     permission_classes = [IsHomeOwnerOrMember]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    hierarchy_pk_level = 'room'
     
     def get_queryset(self):
         home_id = self.kwargs['home_pk']
-        return Room.objects.filter(home__id=home_id)
+        return Room.objects.filter(home__id=home_id).annotate(devices_count=Count('devices'))
+    
+    def get_list_version(self):
+        return get_home_version(self.kwargs['home_pk'])
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -31,11 +38,9 @@ class RoomViewSet(viewsets.ModelViewSet):
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        home_id = self.kwargs['home_pk']
+        # the list does not use the home, the other actions share the request's hierarchy
         if self.action != 'list':
-            context['home'] = get_object_or_404(Home, id=home_id)
-        else:
-            context['home'] = Home.objects.filter(id=home_id).first()
+            context['home'] = self.get_hierarchy().home
         return context
     
     def create(self, request, *args, **kwargs):
@@ -50,23 +55,20 @@ class RoomViewSet(viewsets.ModelViewSet):
                 )
             room = serializer.save()
             user = request.user
-            if user.is_authenticated and hasattr(user, 'points'):
-                user.points += 10
-                user.save()
-            # Historique action utilisateur
+            award_points(user, POINTS_ROOM_CREATED, 'room_created')
+            # Historique action utilisateur (écrit par l'abonné d'audit)
             user = request.user if request.user.is_authenticated else None
 
             ip = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] or request.META.get('REMOTE_ADDR')
             user_agent = request.META.get('HTTP_USER_AGENT', '')
-            if user:
-                ActionHistory.objects.create(
-                    user=user,
-                    action_type="CREATE_ROOM",
-                    target_id=str(room.id),
-                    target_repr=str(room),
-                    ip_address=ip,
-                    user_agent=user_agent
-                )
+            bus.publish(RoomCreated(
+                home_id=str(room.home_id),
+                room_id=str(room.id),
+                user_id=str(user.id) if user else None,
+                target_repr=str(room),
+                ip_address=ip,
+                user_agent=user_agent
+            ))
             return ApiResponse.success(
                 RoomSerializer(room).data,
                 message="Room created successfully",
@@ -4,19 +4,25 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User
 from .models_login_history import LoginHistory
 from .models_action_history import ActionHistory
+from .models_email_outbox import EmailOutbox
+from .models_points_ledger import PointsLedger
+from .models_deletion_job import DeletionJob
+from utils.admin import LargeTableAdmin, RecentRowsInline
 
-class LoginHistoryInline(admin.TabularInline):
+class LoginHistoryInline(RecentRowsInline):
     model = LoginHistory
-    extra = 0
+    max_rows = 20
+    ordering = ('-login_datetime',)
+    list_select_related = ('user',)
     fields = ('login_datetime', 'ip_address', 'user_agent')
     readonly_fields = ('login_datetime', 'ip_address', 'user_agent')
     can_delete = False
     verbose_name = 'Connexion'
-    verbose_name_plural = 'Connexions'
+    verbose_name_plural = 'Connexions (20 dernières)'
     show_change_link = False
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableAdmin, BaseUserAdmin):
     model = User
     list_display = (
         'email', 'username', 'role', 'level', 'points', 'is_email_verified',
@@ -24,13 +30,13 @@ class UserAdmin(BaseUserAdmin):
     )
     list_filter = ('role', 'level', 'is_email_verified', 'is_staff', 'is_superuser', 'date_joined')
     search_fields = ('email', 'username')
-    readonly_fields = ('date_joined', 'last_login')
+    readonly_fields = ('date_joined', 'last_login', 'deleted_at')
     ordering = ('-date_joined',)
     fieldsets = (
         (None, {'fields': ('email', 'username', 'password', 'profile_photo')}),
         ('Rôle et permissions', {'fields': ('role', 'level', 'points', 'guest_permissions', 'is_email_verified')}),
         ('Permissions Django', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
-        ('Dates', {'fields': ('date_joined', 'last_login'), 'classes': ('collapse',)}),
+        ('Dates', {'fields': ('date_joined', 'last_login', 'deleted_at'), 'classes': ('collapse',)}),
     )
     add_fieldsets = (
         (None, {
@@ -42,17 +48,46 @@ class UserAdmin(BaseUserAdmin):
     inlines = [LoginHistoryInline]
 
 @admin.register(LoginHistory)
-class LoginHistoryAdmin(admin.ModelAdmin):
+class LoginHistoryAdmin(LargeTableAdmin):
     list_display = ('user', 'login_datetime', 'ip_address', 'user_agent')
-    list_filter = ('login_datetime', 'ip_address')
-    search_fields = ('user__email', 'ip_address', 'user_agent')
+    list_filter = ('login_datetime',)
+    list_select_related = ('user',)
+    search_fields = ('user__email', '=ip_address')
     readonly_fields = ('login_datetime', 'ip_address', 'user_agent', 'user')
     ordering = ('-login_datetime',)
 
 @admin.register(ActionHistory)
-class ActionHistoryAdmin(admin.ModelAdmin):
+class ActionHistoryAdmin(LargeTableAdmin):
     list_display = ('user', 'action_type', 'target_repr', 'action_datetime', 'ip_address')
-    list_filter = ('action_type', 'action_datetime', 'ip_address')
-    search_fields = ('user__email', 'target_repr', 'ip_address', 'user_agent')
+    list_filter = ('action_type', 'action_datetime')
+    list_select_related = ('user',)
+    search_fields = ('user__email', 'target_repr', '=ip_address')
     readonly_fields = ('user', 'action_type', 'target_id', 'target_repr', 'action_datetime', 'ip_address', 'user_agent')
-    ordering = ('-action_datetime',)
\ No newline at end of file
+    ordering = ('-action_datetime',)
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(LargeTableAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('recipient', 'subject', 'body', 'from_email', 'attempts', 'last_error', 'created_at', 'sent_at')
+    ordering = ('-created_at',)
+
+@admin.register(PointsLedger)
+class PointsLedgerAdmin(LargeTableAdmin):
+    list_display = ('user', 'amount', 'reason', 'created_at')
+    list_select_related = ('user',)
+    search_fields = ('user__email',)
+    readonly_fields = ('user', 'amount', 'reason', 'created_at')
+    ordering = ('-created_at',)
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'target_repr', 'status', 'step', 'deleted_rows', 'created_at', 'updated_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    search_fields = ('target_repr', 'target_id')
+    readonly_fields = (
+        'kind', 'target_id', 'target_repr', 'requested_by', 'step', 'deleted_rows', 'last_error',
+        'created_at', 'updated_at', 'finished_at'
+    )
+    ordering = ('-created_at',)
@@ -0,0 +1,146 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from utils.sqlite import retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+#audit writer: LoginHistory / ActionHistory rows are buffered in memory and bulk inserted from a background thread
+
+_STOP = object()
+
+
+def client_ip(request):
+    if request is None:
+        return None
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0]
+    return request.META.get('REMOTE_ADDR')
+
+
+class AuditWriter:
+    """
+    record() queues an unsaved audit row once the current transaction
+    commits. A daemon thread writes the queue with one bulk_create per
+    model, whenever BATCH_SIZE rows are waiting or FLUSH_INTERVAL seconds
+    after the first one. close() (registered with atexit) drains what is
+    left before the process exits.
+    """
+
+    BATCH_SIZE = 200
+    FLUSH_INTERVAL = 1.0
+    # the API login and the user_logged_in signal can both report the same login
+    LOGIN_DEDUPE_SECONDS = 10
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._recent_logins = {}
+
+    def record(self, instance):
+        transaction.on_commit(lambda: self._enqueue(instance))
+
+    def record_login(self, user, request=None):
+        from .models_login_history import LoginHistory
+        ip = client_ip(request)
+        user_agent = request.META.get('HTTP_USER_AGENT', '') if request is not None else ''
+        now = time.monotonic()
+        key = (user.pk, ip, user_agent)
+        with self._lock:
+            self._recent_logins = {
+                seen_key: seen_at for seen_key, seen_at in self._recent_logins.items()
+                if now - seen_at < self.LOGIN_DEDUPE_SECONDS
+            }
+            if key in self._recent_logins:
+                return
+            self._recent_logins[key] = now
+        self.record(LoginHistory(
+            user=user,
+            login_datetime=timezone.now(),
+            ip_address=ip,
+            user_agent=user_agent
+        ))
+
+    def _enqueue(self, instance):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._worker.start()
+        self._queue.put(instance)
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.FLUSH_INTERVAL
+        while len(batch) < self.BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            try:
+                self._write(batch)
+            finally:
+                close_old_connections()
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        by_model = {}
+        for instance in batch:
+            by_model.setdefault(type(instance), []).append(instance)
+        for model, instances in by_model.items():
+            try:
+                retry_on_locked(model.objects.bulk_create)(instances)
+            except Exception:
+                logger.exception("Audit writer dropped %d %s rows", len(instances), model.__name__)
+
+    def flush(self, timeout=5.0):
+        """Wait until the rows queued so far are written (tests, scripts)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout=5.0):
+        # rows still travelling through the event bus (see users.signals) come first
+        from utils.events import bus
+        bus.flush(timeout)
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            worker.join(timeout)
+        # nothing left running: write whatever is still queued from this thread
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if item is not _STOP:
+                leftovers.append(item)
+        if leftovers:
+            self._write(leftovers)
+
+
+writer = AuditWriter()
+atexit.register(writer.close)
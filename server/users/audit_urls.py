@@ -0,0 +1,17 @@
+from django.urls import path
+from .views import ActionHistoryAuditViewSet, LoginHistoryAuditViewSet
+
+urlpatterns = [
+    path('actions/',
+         ActionHistoryAuditViewSet.as_view({'get': 'list'}),
+         name='audit-action-list'),
+    path('actions/<int:pk>/',
+         ActionHistoryAuditViewSet.as_view({'get': 'retrieve'}),
+         name='audit-action-detail'),
+    path('logins/',
+         LoginHistoryAuditViewSet.as_view({'get': 'list'}),
+         name='audit-login-list'),
+    path('logins/<int:pk>/',
+         LoginHistoryAuditViewSet.as_view({'get': 'retrieve'}),
+         name='audit-login-detail'),
+]
@@ -0,0 +1,44 @@
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+#cached user rows for the per-request authentication, versioned per user (see users.signals)
+#only with a cache shared by all the processes, an invalidation must reach every worker
+
+# columns never needed to authenticate or authorize a request, loaded lazily if a view reads them
+DEFERRED_FIELDS = ('profile_photo',)
+
+
+def _version_key(user_id):
+    return f"auth_user_version:{user_id}"
+
+
+def _cache_key(user_id, version):
+    return f"auth_user:{user_id}:{version}"
+
+
+def get_user_version(user_id):
+    key = _version_key(user_id)
+    cache.add(key, uuid.uuid4().hex[:12], timeout=None)
+    return cache.get(key)
+
+
+def get_cached_user(user_id):
+    """The user with this id, from the cache or one query. None if it does not exist."""
+    from homes.membership import uses_shared_cache
+    if not uses_shared_cache():
+        return get_user_model().objects.defer(*DEFERRED_FIELDS).filter(pk=user_id).first()
+    key = _cache_key(user_id, get_user_version(user_id))
+    user = cache.get(key)
+    if user is None:
+        user = get_user_model().objects.defer(*DEFERRED_FIELDS).filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, getattr(settings, 'AUTH_USER_CACHE_TTL', 60))
+    return user
+
+
+def invalidate_cached_user(user_id):
+    # a new version makes every cached copy unreachable, in every process sharing the cache
+    cache.set(_version_key(user_id), uuid.uuid4().hex[:12], timeout=None)
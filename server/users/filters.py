@@ -0,0 +1,24 @@
+from django_filters import rest_framework as filters
+from .models_action_history import ActionHistory
+from .models_login_history import LoginHistory
+
+
+class ActionHistoryFilter(filters.FilterSet):
+    # by id: no user row is loaded to validate the filter
+    user = filters.UUIDFilter(field_name='user_id')
+    since = filters.IsoDateTimeFilter(field_name='action_datetime', lookup_expr='gte')
+    until = filters.IsoDateTimeFilter(field_name='action_datetime', lookup_expr='lt')
+
+    class Meta:
+        model = ActionHistory
+        fields = ['user', 'action_type', 'since', 'until']
+
+
+class LoginHistoryFilter(filters.FilterSet):
+    user = filters.UUIDFilter(field_name='user_id')
+    since = filters.IsoDateTimeFilter(field_name='login_datetime', lookup_expr='gte')
+    until = filters.IsoDateTimeFilter(field_name='login_datetime', lookup_expr='lt')
+
+    class Meta:
+        model = LoginHistory
+        fields = ['user', 'ip_address', 'since', 'until']
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from users.purge import BATCH_SIZE, purge_pending
+
+
+class Command(BaseCommand):
+    help = "Purge the rows of the deleted homes and accounts, once or in a loop (separate worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling the deletion jobs")
+        parser.add_argument('--interval', type=float, default=30.0, help="Seconds between polls with --loop")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            done, failed = purge_pending(options['batch_size'])
+            if done or failed or not options['loop']:
+                self.stdout.write(f"{done} deletion jobs done, {failed} failed")
+            if not options['loop']:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
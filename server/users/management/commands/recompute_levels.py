@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from users.points import recompute_levels
+
+
+class Command(BaseCommand):
+    help = "Raise the users' levels reached by their points, never lowering one (run periodically, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        changed = recompute_levels(batch_size=options['batch_size'])
+        self.stdout.write(f"{changed} users changed level")
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from users.outbox import BATCH_SIZE, send_all_pending
+
+
+class Command(BaseCommand):
+    help = "Send the pending emails of the outbox, once or in a loop (separate worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling the outbox")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_all_pending(options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(f"{sent} sent, {failed} failed")
+            if not options['loop']:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
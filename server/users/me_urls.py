@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import me
+from .views import me, deletion_job
 
 urlpatterns = [
     path('', me, name='me'),
+    path('deletions/<uuid:pk>/', deletion_job, name='me-deletion-job'),
 ]
\ No newline at end of file
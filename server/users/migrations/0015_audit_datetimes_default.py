@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 04:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_remove_user_is_guest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='actionhistory',
+            name='action_datetime',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='loginhistory',
+            name='login_datetime',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_deletion_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='actionhistory',
+            index=models.Index(fields=['user', 'action_datetime'], name='users_actio_user_id_ebe6c5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actionhistory',
+            index=models.Index(fields=['action_type', 'action_datetime'], name='users_actio_action__1bb486_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actionhistory',
+            index=models.Index(fields=['action_datetime'], name='users_actio_action__e5cf99_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginhistory',
+            index=models.Index(fields=['user', 'login_datetime'], name='users_login_user_id_966e64_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginhistory',
+            index=models.Index(fields=['login_datetime'], name='users_login_login_d_f433c9_idx'),
+        ),
+    ]
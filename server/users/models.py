@@ -37,9 +37,7 @@ class UserManager(BaseUserManager):
 class User(AbstractUser):
     is_guest = models.BooleanField(default=False, help_text="Désigne si l'utilisateur est un invité.")
     def can_add_home(self):
-        from homes.models import Home
-        from django.db.models import Q
-        total = Home.objects.filter(Q(owner=self) | Q(members=self)).distinct().count()
+        total = self.home_accesses.count()
         return total < 3
 
     ROLES = [
@@ -100,6 +98,8 @@ class User(AbstractUser):
 
     date_joined = models.DateTimeField(auto_now_add=True)
     last_login = models.DateTimeField(null=True, blank=True)
+    # tombstone: set by DELETE /me/, the row itself is removed by the background purger
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -113,3 +113,8 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-date_joined']
+
+
+from .models_email_outbox import EmailOutbox  # registered with the users models
+from .models_points_ledger import PointsLedger
+from .models_deletion_job import DeletionJob
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class ActionHistory(models.Model):
     ACTION_TYPES = [
@@ -11,7 +12,7 @@ class ActionHistory(models.Model):
     action_type = models.CharField(max_length=32, choices=ACTION_TYPES)
     target_id = models.CharField(max_length=64, null=True, blank=True)
     target_repr = models.CharField(max_length=255, null=True, blank=True)
-    action_datetime = models.DateTimeField(auto_now_add=True)
+    action_datetime = models.DateTimeField(default=timezone.now, editable=False)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
 
@@ -19,6 +20,12 @@ class ActionHistory(models.Model):
         verbose_name = 'Historique action utilisateur'
         verbose_name_plural = 'Historiques actions utilisateurs'
         ordering = ['-action_datetime']
+        # the audit API filters on the user or the action type, then walks the time column (audit API in users.views)
+        indexes = [
+            models.Index(fields=['user', 'action_datetime']),
+            models.Index(fields=['action_type', 'action_datetime']),
+            models.Index(fields=['action_datetime']),
+        ]
 
     def __str__(self):
         return f"{self.user} {self.get_action_type_display()} sur {self.target_repr or self.target_id} à {self.action_datetime}"
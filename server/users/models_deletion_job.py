@@ -0,0 +1,50 @@
+import uuid
+from django.conf import settings
+from django.db import models
+
+
+class DeletionJob(models.Model):
+    """
+    Background deletion of a tombstoned home or account (see users.purge).
+    The purger updates step and deleted_rows after every batch, so the row
+    doubles as the progress report.
+    """
+
+    class Kind(models.TextChoices):
+        HOME = 'home', 'Home'
+        USER = 'user', 'User'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    target_id = models.UUIDField()
+    target_repr = models.CharField(max_length=255, blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='deletion_jobs'
+    )
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    step = models.CharField(max_length=64, blank=True)
+    deleted_rows = models.PositiveBigIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # heartbeat of the worker running the job, a stale one lets another worker take over
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Deletion Job'
+        verbose_name_plural = 'Deletion Jobs'
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'updated_at'])]
+
+    def __str__(self):
+        return f"Delete {self.kind} {self.target_repr or self.target_id} ({self.status})"
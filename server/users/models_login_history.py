@@ -1,9 +1,11 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class LoginHistory(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='login_histories')
-    login_datetime = models.DateTimeField(auto_now_add=True)
+    # set by the caller: rows are written later, in batches (see users.audit)
+    login_datetime = models.DateTimeField(default=timezone.now, editable=False)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
 
@@ -14,3 +16,7 @@ class LoginHistory(models.Model):
         verbose_name = 'Login History'
         verbose_name_plural = 'Login Histories'
         ordering = ['-login_datetime']
+        indexes = [
+            models.Index(fields=['user', 'login_datetime']),
+            models.Index(fields=['login_datetime']),
+        ]
@@ -0,0 +1,21 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class PointsLedger(models.Model):
+    """Append-only record of the points awarded to a user; User.points is their running total."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='points_entries')
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=32)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        verbose_name = 'Points Ledger Entry'
+        verbose_name_plural = 'Points Ledger'
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.user_id} {self.amount:+d} ({self.reason})"
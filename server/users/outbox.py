@@ -0,0 +1,110 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from utils.sqlite import retry_on_locked
+from utils.workers import BackgroundWorker
+from .models_email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+#email outbox sender: pending EmailOutbox rows are sent in batches over one backend connection
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+# how long a worker holds the rows of a batch before another worker may retry them
+LEASE_SECONDS = 300
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+
+def _claim(batch_size, now):
+    """
+    Take up to batch_size due rows. Their next_attempt_at is moved to a lease
+    date unique to this call, so concurrent workers never send the same row.
+    """
+    due = list(
+        EmailOutbox.objects.filter(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now)
+        .order_by('next_attempt_at')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not due:
+        return []
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    EmailOutbox.objects.filter(id__in=due, next_attempt_at__lte=now).update(next_attempt_at=lease)
+    return list(EmailOutbox.objects.filter(id__in=due, next_attempt_at=lease))
+
+
+def send_pending(batch_size=BATCH_SIZE, connection=None):
+    """Send one batch of due emails. Returns (sent, failed)."""
+    now = timezone.now()
+    emails = _claim(batch_size, now)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+                to=[email.recipient],
+                connection=connection,
+            )
+            email.attempts += 1
+            try:
+                message.send()
+            except Exception as error:
+                failed += 1
+                email.last_error = str(error)
+                if email.attempts >= MAX_ATTEMPTS:
+                    email.status = EmailOutbox.Status.FAILED
+                else:
+                    email.next_attempt_at = timezone.now() + backoff(email.attempts)
+                logger.warning("Sending email %s failed (attempt %d): %s", email.id, email.attempts, error)
+            else:
+                sent += 1
+                email.status = EmailOutbox.Status.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+    except Exception as error:
+        # the connection itself failed: the whole batch is retried later
+        for email in emails:
+            if email.status == EmailOutbox.Status.PENDING and email.next_attempt_at > now:
+                email.next_attempt_at = timezone.now() + backoff(max(email.attempts, 1))
+                email.last_error = str(error)
+        logger.warning("Email backend unavailable: %s", error)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+        # the emails are gone already: losing this write to a lock would send them twice
+        retry_on_locked(EmailOutbox.objects.bulk_update)(
+            emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+    return sent, failed
+
+
+def send_all_pending(batch_size=BATCH_SIZE):
+    """Send batches until nothing is due. Returns (sent, failed)."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_pending(batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
+
+
+# in-process sender, woken after each commit that queued an email;
+# EMAIL_OUTBOX_IN_PROCESS = False when the send_outbox command runs as a separate worker
+sender = BackgroundWorker('email-outbox', send_all_pending, 'EMAIL_OUTBOX_IN_PROCESS')
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from utils.sqlite import retry_on_locked
+from .cache import invalidate_cached_user
+from .models_points_ledger import PointsLedger
+
+#points: ledger entry + atomic increment of User.points, levels raised in batch (recompute_levels command)
+
+POINTS_REGISTER = 20
+POINTS_LOGIN = 10
+POINTS_HOME_CREATED = 30
+POINTS_ROOM_CREATED = 10
+POINTS_DEVICE_CREATED = 5
+
+# minimum points of each level, highest first; the level chosen at registration
+# or by an admin is a floor, the points only ever raise it.
+# the only copy of these values: the client displays the `level` of /me/
+LEVEL_THRESHOLDS = [
+    ('ADVANCED', 70),
+    ('INTERMEDIATE', 35),
+    ('BEGINNER', 0),
+]
+
+
+@retry_on_locked
+def award_points(user, amount, reason):
+    """
+    Add `amount` points to the user with an UPDATE ... SET points = points + amount,
+    so concurrent awards are never lost and the user row is not rewritten.
+    The in-memory user is updated for the response.
+    """
+    if user is None or not user.is_authenticated:
+        return
+    with transaction.atomic():
+        PointsLedger.objects.create(user_id=user.pk, amount=amount, reason=reason)
+        get_user_model().objects.filter(pk=user.pk).update(points=F('points') + amount)
+    user.points = (user.points or 0) + amount
+    # update() sends no post_save, so the cached authentication row is invalidated here
+    user_id = user.pk
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+def level_for(points):
+    for level, minimum in LEVEL_THRESHOLDS:
+        if points >= minimum:
+            return level
+    return LEVEL_THRESHOLDS[-1][0]
+
+
+def effective_level(level, points):
+    """The higher of the stored level and the one the points reach, before the batch job catches up."""
+    ranks = {name: rank for rank, (name, _) in enumerate(LEVEL_THRESHOLDS)}
+    reached = level_for(points)
+    return reached if ranks[reached] < ranks.get(level, len(ranks)) else level
+
+
+def recompute_levels(batch_size=1000):
+    """
+    Raise every user whose points reach a higher level than theirs, in
+    batches of ids; a level is never lowered. Returns the number of users changed.
+    """
+    User = get_user_model()
+    changed = 0
+    upper = None
+    for index, (level, minimum) in enumerate(LEVEL_THRESHOLDS):
+        lower_levels = [lower for lower, _ in LEVEL_THRESHOLDS[index + 1:]]
+        if not lower_levels:
+            break
+        users = User.objects.filter(level__in=lower_levels, points__gte=minimum)
+        if upper is not None:
+            users = users.filter(points__lt=upper)
+        user_ids = list(users.values_list('id', flat=True))
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            User.objects.filter(id__in=batch).update(level=level)
+            for user_id in batch:
+                invalidate_cached_user(user_id)
+        changed += len(user_ids)
+        upper = minimum
+    return changed
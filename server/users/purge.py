@@ -0,0 +1,198 @@
+import logging
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from devices.models import DeviceCommand, DeviceConsumptionHistory
+from homes.membership import invalidate_home_access
+from homes.models import Home, HomeAccess, HomeInvitation
+from utils.sqlite import retry_on_locked
+from utils.workers import BackgroundWorker
+from .models_action_history import ActionHistory
+from .models_deletion_job import DeletionJob
+from .models_login_history import LoginHistory
+from .models_points_ledger import PointsLedger
+
+logger = logging.getLogger(__name__)
+
+#background deletion: homes and accounts are tombstoned by the API, then their rows are purged in small batches
+
+BATCH_SIZE = 500
+# pause between two batches, so that the requests waiting for the SQLite write lock get it
+BATCH_PAUSE_SECONDS = 0.05
+# a running job without progress for this long is taken over by another worker
+LEASE_SECONDS = 300
+
+
+def _hide_home(home, now):
+    """The tombstone of a home: gone from every list and access check, nobody can join it anymore."""
+    Home.objects.filter(id=home.id).update(deleted_at=now)
+    user_ids = list(HomeAccess.objects.filter(home_id=home.id).values_list('user_id', flat=True))
+    HomeAccess.objects.filter(home_id=home.id).delete()
+    HomeInvitation.objects.filter(home_id=home.id, status=HomeInvitation.Status.PENDING).update(
+        status=HomeInvitation.Status.EXPIRED, updated_at=now
+    )
+    invalidate_home_access(home.id, user_ids)
+
+
+def tombstone_home(home, requested_by=None):
+    """Hide the home right away and queue the deletion of its rows. Returns the DeletionJob."""
+    with transaction.atomic():
+        _hide_home(home, timezone.now())
+        job = DeletionJob.objects.create(
+            kind=DeletionJob.Kind.HOME, target_id=home.id, target_repr=home.name[:255], requested_by=requested_by
+        )
+        transaction.on_commit(purger.wake)
+    return job
+
+
+def tombstone_user(user):
+    """
+    Deactivate the account, hide its homes and free its email and username
+    for a new registration, then queue the deletion of its rows.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        for home in Home.objects.filter(owner=user, deleted_at__isnull=True):
+            _hide_home(home, now)
+        user.member_homes.clear()
+        job = DeletionJob.objects.create(kind=DeletionJob.Kind.USER, target_id=user.pk, target_repr=user.email)
+        user.is_active = False
+        user.deleted_at = now
+        user.email = f"deleted-{user.pk}@deleted.invalid"
+        user.username = f"deleted-{user.pk}"
+        user.set_unusable_password()
+        user.save(update_fields=['is_active', 'deleted_at', 'email', 'username', 'password'])
+        transaction.on_commit(purger.wake)
+    return job
+
+
+def _home_steps(home_id):
+    return [
+        ('consumption history', DeviceConsumptionHistory.objects.filter(device__room__home_id=home_id)),
+        ('device commands', DeviceCommand.objects.filter(device__room__home_id=home_id)),
+    ]
+
+
+def _user_steps(user_id):
+    return [
+        ('action history', ActionHistory.objects.filter(user_id=user_id)),
+        ('login history', LoginHistory.objects.filter(user_id=user_id)),
+        ('points ledger', PointsLedger.objects.filter(user_id=user_id)),
+    ]
+
+
+class _Progress:
+    def __init__(self, job):
+        self.job = job
+
+    @retry_on_locked
+    def report(self, step, deleted):
+        DeletionJob.objects.filter(id=self.job.id).update(
+            step=step, deleted_rows=F('deleted_rows') + deleted, updated_at=timezone.now()
+        )
+
+
+@retry_on_locked
+def _delete_batch(model, ids):
+    with transaction.atomic():
+        deleted, _ = model.objects.filter(pk__in=ids).delete()
+    return deleted
+
+
+def _purge(queryset, step, progress, batch_size):
+    """Delete the rows of queryset batch_size at a time, one short transaction per batch."""
+    model = queryset.model
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        deleted = _delete_batch(model, ids)
+        progress.report(step, deleted)
+        time.sleep(BATCH_PAUSE_SECONDS)
+
+
+def _purge_home(home_id, progress, batch_size):
+    for step, queryset in _home_steps(home_id):
+        _purge(queryset, step, progress, batch_size)
+    # what is left (rooms, devices, rules, scenes, invitations) is small and goes with the home
+    home = Home.objects.filter(id=home_id).first()
+    if home is not None:
+        with transaction.atomic():
+            deleted, _ = home.delete()
+        progress.report('home', deleted)
+
+
+def _purge_user(user_id, progress, batch_size):
+    for home_id in Home.objects.filter(owner_id=user_id).values_list('id', flat=True):
+        _purge_home(home_id, progress, batch_size)
+    for step, queryset in _user_steps(user_id):
+        _purge(queryset, step, progress, batch_size)
+    # the commands sent in the homes of other users are kept, without their author
+    commands = DeviceCommand.objects.filter(user_id=user_id)
+    while True:
+        ids = list(commands.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        DeviceCommand.objects.filter(pk__in=ids).update(user=None)
+        progress.report('command authors', 0)
+        time.sleep(BATCH_PAUSE_SECONDS)
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is not None:
+        with transaction.atomic():
+            deleted, _ = user.delete()
+        progress.report('account', deleted)
+
+
+def _claim(now):
+    """Take the oldest pending job, or a running one whose worker stopped reporting."""
+    stale = now - timedelta(seconds=LEASE_SECONDS)
+    candidates = DeletionJob.objects.filter(status=DeletionJob.Status.PENDING) | DeletionJob.objects.filter(
+        status=DeletionJob.Status.RUNNING, updated_at__lt=stale
+    )
+    job = candidates.order_by('created_at').first()
+    if job is None:
+        return None
+    claimed = DeletionJob.objects.filter(id=job.id, status=job.status, updated_at=job.updated_at).update(
+        status=DeletionJob.Status.RUNNING, updated_at=now
+    )
+    return job if claimed else _claim(now)
+
+
+def run_job(job, batch_size=BATCH_SIZE):
+    progress = _Progress(job)
+    try:
+        if job.kind == DeletionJob.Kind.HOME:
+            _purge_home(job.target_id, progress, batch_size)
+        else:
+            _purge_user(job.target_id, progress, batch_size)
+    except Exception as error:
+        logger.exception("Deletion job %s failed", job.id)
+        DeletionJob.objects.filter(id=job.id).update(
+            status=DeletionJob.Status.FAILED, last_error=str(error), updated_at=timezone.now()
+        )
+        return False
+    DeletionJob.objects.filter(id=job.id).update(
+        status=DeletionJob.Status.DONE, step='', finished_at=timezone.now(), updated_at=timezone.now()
+    )
+    return True
+
+
+def purge_pending(batch_size=BATCH_SIZE):
+    """Run the queued deletion jobs one after the other. Returns (done, failed)."""
+    done = failed = 0
+    while True:
+        job = _claim(timezone.now())
+        if job is None:
+            return done, failed
+        if run_job(job, batch_size):
+            done += 1
+        else:
+            failed += 1
+
+
+# in-process purger, woken after each tombstone;
+# DELETION_PURGE_IN_PROCESS = False when the purge_deleted command runs as a separate worker
+purger = BackgroundWorker('deletion-purger', purge_pending, 'DELETION_PURGE_IN_PROCESS')
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from utils.validators import validate_password
+from .models_deletion_job import DeletionJob
+from .models_action_history import ActionHistory
+from .models_login_history import LoginHistory
 
 User = get_user_model()
 
@@ -78,11 +81,21 @@ class UserMeSerializer(UserSerializer):
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + ['owned_homes_count', 'member_homes_count', 'points', 'display_name', 'guest_detail']
     
+    def to_representation(self, instance):
+        from .points import effective_level
+        data = super().to_representation(instance)
+        # recompute_levels raises the stored level later, the profile shows the level reached already
+        data['level'] = effective_level(instance.level, instance.points or 0)
+        return data
+    
+    # annotated by the me view, counted here otherwise
     def get_owned_homes_count(self, obj):
-        return obj.owned_homes.count()
+        count = getattr(obj, 'owned_homes_count', None)
+        return obj.owned_homes.filter(deleted_at__isnull=True).count() if count is None else count
     
     def get_member_homes_count(self, obj):
-        return obj.member_homes.count()
+        count = getattr(obj, 'member_homes_count', None)
+        return obj.member_homes.filter(deleted_at__isnull=True).count() if count is None else count
 
 
 class UserCreateSerializer(UserSerializerMixin, serializers.ModelSerializer):
@@ -143,4 +156,29 @@ class UserUpdateSerializer(UserSerializerMixin, serializers.ModelSerializer):
     
     def update(self, instance, validated_data):
         validated_data.pop('current_password', None)
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionJob
+        fields = ['id', 'kind', 'target_id', 'target_repr', 'status', 'step', 'deleted_rows', 'created_at', 'updated_at', 'finished_at']
+        read_only_fields = fields
+
+
+class ActionHistorySerializer(serializers.ModelSerializer):
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+
+    class Meta:
+        model = ActionHistory
+        fields = ['id', 'user', 'user_email', 'action_type', 'target_id', 'target_repr', 'action_datetime', 'ip_address', 'user_agent']
+        read_only_fields = fields
+
+
+class LoginHistorySerializer(serializers.ModelSerializer):
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+
+    class Meta:
+        model = LoginHistory
+        fields = ['id', 'user', 'user_email', 'login_datetime', 'ip_address', 'user_agent']
+        read_only_fields = fields
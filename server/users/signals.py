@@ -1,23 +1,49 @@
 from django.dispatch import receiver
+from django.conf import settings
 from django.contrib.auth.signals import user_logged_in
-from django.utils import timezone
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from .audit import writer
+from .cache import invalidate_cached_user
+
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
-    from .models_login_history import LoginHistory  # Import déplacé ici
-    ip = None
-    if request:
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-    else:   
-        user_agent = ''
-    LoginHistory.objects.create(
-        user=user,
-        login_datetime=timezone.now(),
-        ip_address=ip,
-        user_agent=user_agent
-    )
\ No newline at end of file
+    writer.record_login(user, request)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_user_cache(sender, instance, **kwargs):
+    # password change, profile update, deactivation, deletion: every save goes through here.
+    # after the commit, so that a concurrent request cannot cache the old row again
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+from utils.events import bus, DeviceCreated, RoomCreated
+
+ACTION_TYPES_BY_EVENT = {
+    DeviceCreated: ("CREATE_DEVICE", 'device_id'),
+    RoomCreated: ("CREATE_ROOM", 'room_id'),
+}
+
+
+def record_action_history(events):
+    """Async event bus subscriber: audit log of the user's actions, written by the audit writer."""
+    from .models_action_history import ActionHistory
+    for event in events:
+        if not event.user_id:
+            continue
+        action_type, target_field = ACTION_TYPES_BY_EVENT[type(event)]
+        writer.record(ActionHistory(
+            user_id=event.user_id,
+            action_type=action_type,
+            target_id=getattr(event, target_field),
+            target_repr=event.target_repr[:255],
+            action_datetime=event.occurred_at,
+            ip_address=event.ip_address,
+            user_agent=event.user_agent,
+        ))
+
+
+bus.subscribe(DeviceCreated, record_action_history, asynchronous=True)
+bus.subscribe(RoomCreated, record_action_history, asynchronous=True)
@@ -1,6 +1,18 @@
 from rest_framework import viewsets, status
 from django.contrib.auth import get_user_model
-from .serializers import UserSerializer, UserCreateSerializer, UserUpdateSerializer, UserMeSerializer
+from django.db import transaction
+from django.db.models import Count, Q
+from .serializers import (
+    UserSerializer, UserCreateSerializer, UserUpdateSerializer, UserMeSerializer, DeletionJobSerializer,
+    ActionHistorySerializer, LoginHistorySerializer
+)
+from .filters import ActionHistoryFilter, LoginHistoryFilter
+from .models_action_history import ActionHistory
+from .models_deletion_job import DeletionJob
+from .models_login_history import LoginHistory
+from utils.pagination import KeysetPagination
+from .purge import tombstone_user
+from utils.exceptions import ResourceNotFoundError
 from utils.responses import ApiResponse
 from utils.permissions import IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
@@ -12,7 +24,7 @@ from rest_framework.permissions import IsAuthenticated
 User = get_user_model()
 
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -58,10 +70,11 @@ class UserViewSet(viewsets.ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        self.perform_destroy(instance)
+        job = tombstone_user(instance)
         return ApiResponse.success(
-            message="User deleted successfully",
-            status_code=status.HTTP_204_NO_CONTENT
+            DeletionJobSerializer(job).data,
+            message="User deletion scheduled",
+            status_code=status.HTTP_202_ACCEPTED
         )
 
 @api_view(['GET', 'PATCH', 'DELETE'])
@@ -69,11 +82,17 @@ class UserViewSet(viewsets.ModelViewSet):
 def me(request):    
     
     if request.method == 'GET':
-        serializer = UserMeSerializer(request.user)
+        user = User.objects.annotate(
+            # tombstoned homes keep their rows until the purge
+            owned_homes_count=Count('owned_homes', filter=Q(owned_homes__deleted_at__isnull=True), distinct=True),
+            member_homes_count=Count('member_homes', filter=Q(member_homes__deleted_at__isnull=True), distinct=True)
+        ).get(pk=request.user.pk)
+        serializer = UserMeSerializer(user)
         return ApiResponse.success(serializer.data)
     elif request.method == 'PATCH':
         data = request.data.copy()
-        user = request.user
+        # request.user can be a cached row: the serializer saves every column, so it works on the current one
+        user = User.objects.get(pk=request.user.pk)
         new_email = data.get('email')
         otp_code = data.get('otp_code')
 
@@ -91,15 +110,14 @@ def me(request):
                         status_code=400,
                     )
                 try:
-                    serializer = UserUpdateSerializer(user, data=payload, partial=True)
-                    serializer.is_valid(raise_exception=True)
-                    user = serializer.save()
-                    user.is_email_verified = False
-                    user.save()
-                    try:
+                    # the new address and its queued verification email are committed together
+                    with transaction.atomic():
+                        serializer = UserUpdateSerializer(user, data=payload, partial=True)
+                        serializer.is_valid(raise_exception=True)
+                        user = serializer.save()
+                        user.is_email_verified = False
+                        user.save()
                         send_email(user, 'email_verification')
-                    except Exception as e:
-                        return ApiResponse.error(message=f"Failed to send verification email: {e}", status_code=400)
                 except Exception as e:
                     return ApiResponse.error(message=f"Failed to update user profile: {e}", status_code=400)
                 request.session.pop('email_change_otp', None)
@@ -151,7 +169,7 @@ def me(request):
                 errors['new_password'] = "The new password must contain at least 8 characters."
             else:
                 user.set_password(new_password)
-                user.save()
+                user.save(update_fields=['password'])
                 password_changed = True
                 success_messages.append("Password changed successfully.")
         
@@ -179,9 +197,56 @@ def me(request):
             message=" ".join(success_messages)
         )
     elif request.method == 'DELETE':
-        request.user.delete()
+        # the account is deactivated now, its rows are purged in the background
+        job = tombstone_user(request.user)
         return ApiResponse.success(
-            message="Account deleted successfully",
-            status_code=status.HTTP_204_NO_CONTENT
+            DeletionJobSerializer(job).data,
+            message="Account deletion scheduled",
+            status_code=status.HTTP_202_ACCEPTED
         )
 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def deletion_job(request, pk):
+    """Progress of a home deletion requested by the user."""
+    job = DeletionJob.objects.filter(id=pk, requested_by=request.user).first()
+    if job is None:
+        raise ResourceNotFoundError("Deletion job not found.")
+    return ApiResponse.success(DeletionJobSerializer(job).data)
+
+
+class ActionHistoryAuditViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Audit log of the user actions, for staff: ?user=, ?action_type=,
+    ?since= / ?until= (ISO datetimes), newest first, keyset paginated.
+    """
+    serializer_class = ActionHistorySerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ActionHistoryFilter
+    pagination_class = KeysetPagination
+    # the id gives a stable order to the rows sharing an action_datetime; the cursor itself
+    # holds the datetime only, plus an offset among those ties (see KeysetPagination)
+    ordering = ('-action_datetime', '-id')
+
+    def get_queryset(self):
+        return ActionHistory.objects.select_related('user').only(
+            'id', 'action_type', 'target_id', 'target_repr', 'action_datetime', 'ip_address', 'user_agent',
+            'user__id', 'user__email'
+        )
+
+
+class LoginHistoryAuditViewSet(viewsets.ReadOnlyModelViewSet):
+    """Audit log of the logins, for staff: ?user=, ?ip_address=, ?since= / ?until=, newest first."""
+    serializer_class = LoginHistorySerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = LoginHistoryFilter
+    pagination_class = KeysetPagination
+    ordering = ('-login_datetime', '-id')
+
+    def get_queryset(self):
+        return LoginHistory.objects.select_related('user').only(
+            'id', 'login_datetime', 'ip_address', 'user_agent', 'user__id', 'user__email'
+        )
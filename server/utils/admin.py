@@ -0,0 +1,109 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+
+#admin helpers for the large tables: per-row counts, capped inlines and estimated changelist counts
+
+
+def related_count(model, field):
+    """
+    Number of `model` rows whose `field` points to the outer row, as a
+    correlated subquery: evaluated for the rows of the page only, unlike a
+    Count() over the join.
+    """
+    rows = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def estimate_table_rows(queryset):
+    """
+    Row count of the table of an unfiltered queryset read from the planner
+    statistics (sqlite_stat1 after ANALYZE, pg_class on PostgreSQL), or
+    None when there is no estimate.
+    """
+    if queryset.query.where:
+        return None
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        sql = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+    elif connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # no statistics table yet
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses the table estimate instead of COUNT(*) for unfiltered changelists above ESTIMATE_ABOVE rows."""
+
+    ESTIMATE_ABOVE = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_table_rows(self.object_list)
+        if estimate is not None and estimate > self.ESTIMATE_ABOVE:
+            return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """ModelAdmin for tables with up to millions of rows: estimated counts, no second full count."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class RecentRowsFormSet(BaseInlineFormSet):
+    max_rows = 20
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset()[:self.max_rows]
+        return self._queryset
+
+
+class RecentRowsInline(admin.TabularInline):
+    """
+    Inline showing the `max_rows` most recent rows only (by `ordering`),
+    the full list being the filtered changelist of the inline model.
+    `list_select_related` is applied as on a changelist, the readonly
+    foreign keys and the row titles would cost one query per row otherwise.
+    """
+
+    formset = RecentRowsFormSet
+    max_rows = 20
+    extra = 0
+    list_select_related = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.max_rows = self.max_rows
+        return formset
@@ -0,0 +1,34 @@
+import hashlib
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalListMixin:
+    """
+    Adds a strong ETag to list responses and answers `If-None-Match` with
+    304 Not Modified before any serializer work.
+
+    Views override get_list_version() returning a cheap value that changes
+    whenever the listed data changes (ex: the per-home change counter).
+    None, the default, means no ETag: the list is served as usual.
+    """
+
+    def get_list_version(self):
+        return None
+
+    def get_list_etag(self, request):
+        version = self.get_list_version()
+        if version is None:
+            return None
+        raw = f"{type(self).__name__}|{request.user.pk}|{request.get_full_path()}|{version}"
+        return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request)
+        if etag is not None and etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = super().list(request, *args, **kwargs)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
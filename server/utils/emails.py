@@ -1,9 +1,10 @@
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from utils.tokens import TokenGenerator
 
 
-def send_email(user, mail_type, context=None, request=None):
+def build_email(user, mail_type, context=None):
+    """Return (recipient, subject, message, token) of an email; token is set for invitations."""
     subject = ''
     message = ''
     recipient = user.email if hasattr(user, 'email') else user
@@ -39,10 +40,37 @@ def send_email(user, mail_type, context=None, request=None):
     else:
         raise ValueError('Unknown mail_type for sending email')
 
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[recipient]
-    )
-    return token 
\ No newline at end of file
+    return recipient, subject, message, token
+
+
+def queue_emails(emails):
+    """
+    Queue (recipient, subject, message) tuples with one insert. They are
+    written with the request's transaction and sent by the outbox sender
+    (see users.outbox) once it commits.
+    """
+    from users.models_email_outbox import EmailOutbox
+    from users.outbox import sender
+    EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            recipient=recipient,
+            subject=subject,
+            body=message,
+            from_email=settings.DEFAULT_FROM_EMAIL
+        )
+        for recipient, subject, message in emails
+    ])
+    transaction.on_commit(sender.wake)
+
+
+def send_email(user, mail_type, context=None, request=None):
+    recipient, subject, message, token = build_email(user, mail_type, context)
+    queue_emails([(recipient, subject, message)])
+    return token
+
+
+def send_emails(user, mail_type, contexts):
+    """send_email for many contexts (e.g. one invitation per email) as one batch. Returns the tokens."""
+    built = [build_email(user, mail_type, context) for context in contexts]
+    queue_emails([(recipient, subject, message) for recipient, subject, message, _ in built])
+    return [token for _, _, _, token in built]
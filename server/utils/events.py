@@ -0,0 +1,173 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+#in-process event bus: domain events are published after commit and fanned out to subscribers
+
+
+@dataclass(frozen=True)
+class Event:
+    occurred_at: Any = field(default_factory=timezone.now, kw_only=True)
+
+
+@dataclass(frozen=True)
+class DeviceCreated(Event):
+    home_id: str
+    device_id: str
+    user_id: Optional[str]
+    target_repr: str
+    ip_address: Optional[str] = None
+    user_agent: str = ''
+
+
+@dataclass(frozen=True)
+class DeviceStateChanged(Event):
+    home_id: str
+    room_id: str
+    device_id: str
+    changes: Dict[str, Any]
+    state: Dict[str, Any]
+    power_kw: float = 0.0
+
+
+@dataclass(frozen=True)
+class CommandExecuted(Event):
+    home_id: str
+    command_id: str
+    device_id: str
+    capability: str
+    parameters: Dict[str, Any]
+    status: str
+    error_message: Optional[str] = None
+    executed_at: Any = None
+
+
+@dataclass(frozen=True)
+class ConsumptionRecorded(Event):
+    home_id: str
+    device_id: str
+    reading: Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class RoomCreated(Event):
+    home_id: str
+    room_id: str
+    user_id: Optional[str]
+    target_repr: str
+    ip_address: Optional[str] = None
+    user_agent: str = ''
+
+
+@dataclass(frozen=True)
+class MemberAdded(Event):
+    home_id: str
+    user_id: str
+
+
+@dataclass(frozen=True)
+class MemberRemoved(Event):
+    home_id: str
+    user_id: str
+
+
+class EventBus:
+    """
+    Synchronous subscribers are called right after the commit, with one
+    event. Asynchronous subscribers are called from a background thread
+    with batches of events, in publish order, so the request only pays
+    for its primary write.
+    """
+
+    BATCH_SIZE = 200
+    BATCH_WAIT_SECONDS = 0.05
+
+    def __init__(self):
+        self._sync = defaultdict(list)
+        self._async = defaultdict(list)
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type, handler, asynchronous=False):
+        handlers = (self._async if asynchronous else self._sync)[event_type]
+        if handler not in handlers:
+            handlers.append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        for registry in (self._sync, self._async):
+            if handler in registry.get(event_type, []):
+                registry[event_type].remove(handler)
+
+    def publish(self, event):
+        transaction.on_commit(lambda: self._dispatch(event))
+
+    def _dispatch(self, event):
+        for handler in self._sync.get(type(event), []):
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("Event subscriber %r failed on %r", handler, event)
+        if self._async.get(type(event)):
+            self._ensure_worker()
+            self._queue.put(event)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='event-bus', daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.BATCH_WAIT_SECONDS
+        while len(batch) < self.BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._deliver(batch)
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, batch):
+        # each handler receives, in order, the events of the batch it subscribed to
+        by_handler = {}
+        for event in batch:
+            for handler in self._async.get(type(event), []):
+                by_handler.setdefault(handler, []).append(event)
+        for handler, events in by_handler.items():
+            try:
+                handler(events)
+            except Exception:
+                logger.exception("Async event subscriber %r failed on %d events", handler, len(events))
+
+    def flush(self, timeout=5.0):
+        """Wait until the queued events have been delivered (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+bus = EventBus()
+atexit.register(bus.flush)
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+from django.shortcuts import get_object_or_404
+
+
+@dataclass(frozen=True)
+class HomeHierarchy:
+    home: Optional[Any] = None
+    room: Optional[Any] = None
+    device: Optional[Any] = None
+
+
+def load_home_hierarchy(home_pk=None, room_pk=None, device_pk=None):
+    """
+    Load the deepest object named by the URL with its parents in one
+    joined query. The parent/child chain is part of the filter, so a room
+    or device requested under another home is a 404.
+    """
+    from homes.models import Home
+    from rooms.models import Room
+    from devices.models import Device
+
+    if device_pk:
+        filters = {'id': device_pk}
+        if room_pk:
+            filters['room_id'] = room_pk
+        if home_pk:
+            filters['room__home_id'] = home_pk
+        device = get_object_or_404(Device.objects.select_related('room__home__owner'), **filters)
+        return HomeHierarchy(home=device.room.home, room=device.room, device=device)
+    if room_pk:
+        filters = {'id': room_pk}
+        if home_pk:
+            filters['home_id'] = home_pk
+        room = get_object_or_404(Room.objects.select_related('home__owner'), **filters)
+        return HomeHierarchy(home=room.home, room=room)
+    if home_pk:
+        return HomeHierarchy(home=get_object_or_404(Home.objects.select_related('owner'), id=home_pk))
+    return HomeHierarchy()
+
+
+class HomeHierarchyMixin:
+    """
+    Request-scoped access to the Home / Room / Device named by the URL
+    (`home_pk`, `room_pk`, `device_pk`), loaded once and shared by the
+    permission checks, querysets and serializer contexts.
+
+    Views whose `pk` is itself a room or a device set hierarchy_pk_level
+    so that get_object() returns it from the same query.
+    """
+
+    hierarchy_pk_level = None
+
+    def get_hierarchy(self):
+        hierarchy = getattr(self.request, '_home_hierarchy', None)
+        if hierarchy is None:
+            kwargs = {
+                f"{level}_pk": self.kwargs.get(f"{level}_pk")
+                for level in ('home', 'room', 'device')
+            }
+            if self.hierarchy_pk_level and self.kwargs.get('pk'):
+                kwargs[f"{self.hierarchy_pk_level}_pk"] = self.kwargs['pk']
+            hierarchy = load_home_hierarchy(**kwargs)
+            self.request._home_hierarchy = hierarchy
+        return hierarchy
+
+    def get_object(self):
+        if self.hierarchy_pk_level and self.kwargs.get('pk'):
+            obj = getattr(self.get_hierarchy(), self.hierarchy_pk_level)
+            self.check_object_permissions(self.request, obj)
+            return obj
+        return super().get_object()
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 from typing import Dict, Any, List
 from collections import OrderedDict
@@ -44,4 +44,60 @@ class StandardResultsSetPagination(PageNumberPagination):
                 },
                 'results': schema,
             }
-        } 
\ No newline at end of file
+        } 
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination for the large append-only tables: the next page is a
+    WHERE on the first ordering column (backed by an index) instead of an
+    OFFSET, so page 1000 costs the same as page 1. The view's `ordering`
+    is used, its first field being the indexed one.
+
+    Only that first field goes in the cursor (DRF's CursorPagination): rows
+    sharing its value at a page boundary are skipped with a small offset
+    stored in the cursor. The next fields (ex: -id) only make the order
+    of those ties stable, they are not part of the cursor position.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-pk'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def get_paginated_response(self, data: List[Dict[str, Any]]) -> Response:
+        return Response(OrderedDict([
+            ('status', 'success'),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'type': 'object',
+            'properties': {
+                'status': {
+                    'type': 'string',
+                    'example': 'success'
+                },
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                    'example': 'https://api.example.org/audit/actions/?cursor=cD0yMDI1LTA1LTAx',
+                },
+                'previous': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                    'example': 'https://api.example.org/audit/actions/?cursor=cj0xJnA9MjAyNS0wNS0wMQ',
+                },
+                'results': schema,
+            }
+        }
@@ -1,6 +1,19 @@
 from rest_framework import permissions
 
 
+def get_home_id(obj):
+    """Id of the home an object belongs to (Home, Room/Scene/... with home_id, Device, DeviceCommand)."""
+    if hasattr(obj, 'members') and hasattr(obj, 'owner'):
+        return obj.pk
+    if getattr(obj, 'home_id', None):
+        return obj.home_id
+    if hasattr(obj, 'room'):
+        return obj.room.home_id
+    if hasattr(obj, 'device'):
+        return obj.device.room.home_id
+    return None
+
+
 class IsAdminUser(permissions.BasePermission):
     
     def has_permission(self, request, view):
@@ -19,55 +32,33 @@ class IsHomeMember(permissions.BasePermission):
     def has_permission(self, request, view):
         home_pk = view.kwargs.get('home_pk')
         if home_pk:
-            from homes.models import Home
-            
-            try:
-                home = Home.objects.get(id=home_pk) 
-                return request.user in home.members.all()
-            except Home.DoesNotExist:
-                return False
+            from homes.membership import resolve_home_role, MEMBER
+            return resolve_home_role(request.user, home_pk, token=request.auth) == MEMBER
         
         return True
     
     def has_object_permission(self, request, view, obj):
-        if hasattr(obj, 'members'):
-            home = obj
-        elif hasattr(obj, 'home'):
-            home = obj.home
-        elif hasattr(obj, 'room') and hasattr(obj.room, 'home'):
-            home = obj.room.home
-        else:
+        from homes.membership import resolve_home_role, MEMBER
+        home_id = get_home_id(obj)
+        if not home_id:
             return False
-        
-        if not home:
-            return False
-        return request.user in home.members.all()
+        return resolve_home_role(request.user, home_id, token=request.auth) == MEMBER
 
 
 class IsHomeOwnerOrMember(permissions.BasePermission):
     def has_permission(self, request, view):
         home_pk = view.kwargs.get('home_pk')
         if home_pk:
-            from homes.models import Home
-            try:
-                home = Home.objects.get(id=home_pk)
-                return (request.user == home.owner) or (request.user in home.members.all())
-            except Home.DoesNotExist:
-                return False
+            from homes.membership import can_access_home
+            return can_access_home(request.user, home_pk, token=request.auth)
         return True
 
     def has_object_permission(self, request, view, obj):
-        if hasattr(obj, 'members') and hasattr(obj, 'owner'):
-            home = obj
-        elif hasattr(obj, 'home') and hasattr(obj.home, 'owner'):
-            home = obj.home
-        elif hasattr(obj, 'room') and hasattr(obj.room, 'home') and hasattr(obj.room.home, 'owner'):
-            home = obj.room.home
-        else:
-            return False
-        if not home:
+        from homes.membership import can_access_home
+        home_id = get_home_id(obj)
+        if not home_id:
             return False
-        return (request.user == home.owner) or (request.user in home.members.all())
+        return can_access_home(request.user, home_id, token=request.auth)
 
 
 class IsOwner(permissions.BasePermission):
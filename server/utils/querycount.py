@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+#per-request SQL instrumentation: query count, SQL time and repeated statements
+
+
+class QueryRecorder:
+    """
+    Context manager recording the SQL statements run on the default
+    connection, through an execute wrapper (works with DEBUG off too).
+
+        with QueryRecorder() as queries:
+            client.get(url)
+        queries.count, queries.duration, queries.duplicates
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.duration = 0.0
+        self._wrapper = None
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self._record)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    def _record(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.statements.append((sql, repr(params)))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def duplicates(self):
+        """Statements run more than once with the same parameters: {sql: times}."""
+        counts = Counter(self.statements)
+        return {sql: times for (sql, _), times in counts.items() if times > 1}
+
+    @property
+    def similar(self):
+        """Statements run more than once with different parameters (N+1 loops): {sql: times}."""
+        counts = Counter(sql for sql, _ in set(self.statements))
+        return {sql: times for sql, times in counts.items() if times > 1}
+
+    def server_timing(self):
+        return ', '.join([
+            f'sql;desc="{self.count} queries";dur={self.duration * 1000:.1f}',
+            f'sql-dup;desc="{sum(self.duplicates.values())} duplicated"',
+            f'sql-similar;desc="{sum(self.similar.values())} similar"',
+        ])
+
+
+class QueryCountMiddleware:
+    """Adds a Server-Timing header with the SQL numbers of the request. DEBUG only."""
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as queries:
+            response = self.get_response(request)
+        response['Server-Timing'] = queries.server_timing()
+        return response
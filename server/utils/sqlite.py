@@ -0,0 +1,78 @@
+import functools
+import logging
+import random
+import time
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+#SQLite profile: pragmas applied to every new connection, and a retry layer for "database is locked"
+
+# overridden with settings.SQLITE_PRAGMAS
+DEFAULT_PRAGMAS = {
+    # readers no longer block the writer (and the other way round); persistent in the database file
+    'journal_mode': 'WAL',
+    # fsync at checkpoints only: durable against a crash of the process, not of the OS, which is WAL's usual trade-off
+    'synchronous': 'NORMAL',
+    # ms a connection waits for the write lock before "database is locked"
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    # negative: KiB, so 20 MB of page cache per connection
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def get_pragmas():
+    return {**DEFAULT_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, get_pragmas())
+
+
+def is_locked_error(error):
+    return isinstance(error, OperationalError) and any(message in str(error) for message in LOCKED_MESSAGES)
+
+
+def retry_on_locked(func=None, *, attempts=None, base_delay=0.05, max_delay=1.0, using='default'):
+    """
+    Retry `func` when SQLite reports "database is locked", with exponential
+    backoff and jitter (settings.SQLITE_LOCK_RETRIES attempts by default).
+
+    Only the outermost call retries: inside an atomic block the transaction
+    is already broken, so the error goes up to the block that owns it.
+    `func` must therefore run its writes in its own transaction.
+    """
+    if func is None:
+        return functools.partial(
+            retry_on_locked, attempts=attempts, base_delay=base_delay, max_delay=max_delay, using=using
+        )
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tries = attempts or getattr(settings, 'SQLITE_LOCK_RETRIES', 5)
+        for attempt in range(1, tries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as error:
+                if not is_locked_error(error) or attempt == tries or connections[using].in_atomic_block:
+                    raise
+                delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+                logger.warning("%s: database is locked, retry %d/%d", func.__qualname__, attempt, tries - 1)
+                time.sleep(random.uniform(delay / 2, delay))
+    return wrapper
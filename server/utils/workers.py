@@ -0,0 +1,59 @@
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+#in-process background workers: a daemon thread running a task when woken, and every poll_seconds
+
+
+class BackgroundWorker:
+    """
+    Runs `task()` in a daemon thread, right after wake() (ex: from
+    transaction.on_commit) and every poll_seconds for the retries. The
+    thread is started on the first wake(). Setting `enabled_setting` to
+    False turns wake() into a no-op, for deployments where the matching
+    management command runs as a separate worker.
+    """
+
+    def __init__(self, name, task, enabled_setting, poll_seconds=30):
+        self.name = name
+        self.task = task
+        self.enabled_setting = enabled_setting
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def wake(self):
+        if not getattr(settings, self.enabled_setting, True):
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.task()
+            except Exception:
+                logger.exception("Background worker %s failed", self.name)
+            finally:
+                close_old_connections()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout)